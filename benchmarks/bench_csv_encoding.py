@@ -0,0 +1,78 @@
+"""
+Time CSV decoding of a large non-UTF-8 file: the old try-every-encoding loop
+versus CSVToJSON with sampled encoding detection.
+
+    python -m benchmarks.bench_csv_encoding [--rows N] [--encoding cp1252]
+
+Accented rows sit at the end of the file, the worst case for the old loop:
+it parses almost the whole file as UTF-8 before failing.
+"""
+import os
+import csv
+import sys
+import time
+import argparse
+import tempfile
+import contextlib
+import io
+
+from fetchers.csv_reader import CSVToJSON, detect_encoding
+
+
+def write_fixture(path, rows, encoding):
+    with open(path, "w", newline="", encoding=encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(["title", "content", "author"])
+        for i in range(rows):
+            writer.writerow([f"Title {i}", f"Plain ascii content for row {i}", "staff"])
+        for i in range(100):
+            writer.writerow([f"Café {i}", "Déjà vu, naïve façade", "Müller"])
+
+
+def legacy_read(path):
+    """The decode loop CSVToJSON.read_csv used before encoding detection."""
+    for encoding in CSVToJSON.ENCODINGS:
+        try:
+            with open(path, newline="", encoding=encoding) as f:
+                rows = []
+                for row in csv.DictReader(f):
+                    if not any(row.values()):
+                        continue
+                    row["source"] = "csv"
+                    rows.append(row)
+                return encoding, rows
+        except UnicodeDecodeError:
+            continue
+    return None, []
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--encoding", default="latin-1")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fixture.csv")
+        write_fixture(path, args.rows, args.encoding)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"Fixture: {args.rows + 100} rows, {size_mb:.1f} MB, {args.encoding}\n")
+
+        legacy_time, (legacy_encoding, legacy_rows) = timed(lambda: legacy_read(path))
+        new_time, rows = timed(lambda: CSVToJSON(path).read_csv())
+
+        print(f"legacy loop : {legacy_time:7.2f}s  ({legacy_encoding}, {len(legacy_rows)} rows)")
+        print(f"detection   : {new_time:7.2f}s  ({detect_encoding(path)}, {len(rows)} rows)")
+        print(f"speedup     : {legacy_time / new_time:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
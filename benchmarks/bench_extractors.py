@@ -0,0 +1,86 @@
+"""
+Compare HTML extractor backends on a corpus of saved pages.
+
+    python -m benchmarks.bench_extractors [html_dir] [--repeat N]
+
+Without html_dir a synthetic corpus of small, medium and large pages is used.
+Reports pages/sec and peak traced memory for each backend.
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+from fetchers.extractors import EXTRACTORS, get_extractor
+
+
+def synthetic_corpus():
+    def page(paragraphs):
+        body = "".join(
+            f"<p>Paragraph {i} with some <b>bold</b> text &amp; a "
+            f"<a href='/l{i}'>link</a>.</p><script>var x={i};</script>"
+            for i in range(paragraphs)
+        )
+        return (
+            "<html><head><title>Synthetic page</title><style>p{}</style></head>"
+            "<body><nav>Home | About</nav><h1>Headline</h1>"
+            f"{body}<footer>Footer</footer></body></html>"
+        )
+
+    return [page(20)] * 20 + [page(500)] * 5 + [page(2000)] * 2
+
+
+def load_corpus(html_dir):
+    pages = []
+    for name in sorted(os.listdir(html_dir)):
+        if name.endswith((".html", ".htm")):
+            with open(os.path.join(html_dir, name), "rb") as f:
+                pages.append(f.read().decode("utf-8", errors="replace"))
+    return pages
+
+
+def bench(extractor, pages, repeat):
+    """
+    Time without tracing, then measure peak memory in a separate pass:
+    tracemalloc slows every allocation, which would penalise the
+    allocation-heavy backends in the timing.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html in pages:
+            extractor.extract(html)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        for html in pages:
+            extractor.extract(html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(pages) * repeat / elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("html_dir", nargs="?")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    pages = load_corpus(args.html_dir) if args.html_dir else synthetic_corpus()
+    if not pages:
+        print("No .html files found")
+        return 1
+
+    total_mb = sum(len(p) for p in pages) / 1e6
+    print(f"Corpus: {len(pages)} pages, {total_mb:.1f} MB, repeat={args.repeat}\n")
+    print(f"{'backend':<12}{'pages/sec':>12}{'peak MB':>12}")
+    for name in EXTRACTORS:
+        rate, peak = bench(get_extractor(name), pages, args.repeat)
+        print(f"{name:<12}{rate:>12.1f}{peak / 1e6:>12.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
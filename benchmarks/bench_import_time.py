@@ -0,0 +1,111 @@
+"""
+Track startup cost with `python -X importtime`.
+
+    python -m benchmarks.bench_import_time [--repeat N] [--top N]
+                                           [--json results.json] [--baseline results.json]
+
+Each target is imported in a fresh interpreter; the cumulative import time
+of the target module itself is reported (median of the runs) with its most
+expensive dependencies. --json saves the numbers and --baseline compares
+against a file saved earlier, so regressions show up as a diff.
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+TARGETS = (
+    "main",
+    "fetchers.registry",
+    "fetchers.csv_fetcher",
+    "fetchers.newsapi_fetcher",
+    "fetchers.web_scraper",
+)
+
+
+def import_times(module):
+    """
+    {name: cumulative_us} for module and everything imported on its behalf,
+    from one fresh interpreter. Interpreter startup (site and friends) is
+    excluded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        entries.append((name.strip(), depth, int(cumulative_us)))
+
+    # A module's own imports are the deeper lines printed just before it
+    for index in range(len(entries) - 1, -1, -1):
+        name, depth, cumulative = entries[index]
+        if name == module:
+            times = {name: cumulative}
+            for child, child_depth, child_cumulative in reversed(entries[:index]):
+                if child_depth <= depth:
+                    break
+                times.setdefault(child, child_cumulative)
+            return times
+    return {module: 0}
+
+
+def measure(module, repeat, top):
+    runs = [import_times(module) for _ in range(repeat)]
+    total = statistics.median(run[module] for run in runs)
+
+    heaviest = {}
+    for run in runs:
+        for name, cumulative in run.items():
+            if name != module:
+                heaviest.setdefault(name, []).append(cumulative)
+    ranked = sorted(
+        ((name, statistics.median(values)) for name, values in heaviest.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    return {"total_us": total, "heaviest": ranked[:top]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("targets", nargs="*", default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--baseline")
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    for target in args.targets:
+        result = measure(target, args.repeat, args.top)
+        results[target] = result
+
+        line = f"{target:<28} {result['total_us'] / 1000:8.1f} ms"
+        if target in baseline:
+            before = baseline[target]["total_us"]
+            line += f"   (baseline {before / 1000:.1f} ms, {(result['total_us'] - before) / 1000:+.1f} ms)"
+        print(line)
+        for name, cumulative in result["heaviest"]:
+            print(f"    {name:<36} {cumulative / 1000:8.1f} ms")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
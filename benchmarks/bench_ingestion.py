@@ -0,0 +1,202 @@
+"""
+Time the ingestion paths end to end against local stand-ins, no network.
+
+    python -m benchmarks.bench_ingestion [--pages N] [--page-bytes N] [--latency S]
+                                         [--error-rate F] [--no-etag]
+                                         [--csv-files N] [--csv-rows N] [--encoding E]
+                                         [--records N] [--store-sizes 0,10000,...]
+                                         [--json results.json] [--baseline results.json]
+
+Cases:
+    web.run_batch.cold     WebScraper.run_batch over --pages stand-in pages
+    web.run_batch.warm     the same URLs again through a warm PageCache
+    csv.CSVToJSON          CSVToJSON.iter_batches over the generated CSV directory
+    append_data[store=S]   main.append_data of --records records into a store of S
+    run_all[store=S]       every source at once (main.run_sources, i.e. run_all
+                           without the screen clear) on top of that store
+
+Each store size gets a fresh output directory seeded through append_batches,
+so the dedup, near-duplicate and search indexes grow with the store. The
+per-host politeness delay is off; the stand-in server is the only host.
+--json saves the results and --baseline prints the change against a
+previous --json file.
+"""
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import contextlib
+
+from benchmarks.fixtures import StandInServer, fake_newsapi, synthetic_records, write_csv_dir
+from fetchers.csv_reader import CSVToJSON
+from fetchers.page_cache import PageCache
+from fetchers.web_scraper import WebScraper
+
+SEED_BATCH = 1000
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn()
+    return time.perf_counter() - start, result
+
+
+def result(seconds, items, **extra):
+    return {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "per_second": round(items / seconds, 1) if seconds else None,
+        **extra,
+    }
+
+
+def bench_web(server, urls, cache_dir, workers):
+    scraper = WebScraper(delay=0, max_workers=workers, cache=PageCache(cache_dir))
+    cases = {}
+    for case in ("cold", "warm"):
+        seconds, pages = timed(lambda: scraper.run_batch(urls))
+        failed = sum(1 for page in pages if page and "error" in page)
+        cases[f"web.run_batch.{case}"] = result(seconds, len(urls), failed=failed)
+    return cases
+
+
+def bench_csv(paths):
+    def read_all():
+        rows = 0
+        for path in paths:
+            for batch in CSVToJSON(path).iter_batches():
+                rows += len(batch)
+        return rows
+
+    seconds, rows = timed(read_all)
+    size = sum(os.path.getsize(path) for path in paths)
+    return {"csv.CSVToJSON": result(seconds, rows, mb_per_second=round(size / 1e6 / seconds, 2))}
+
+
+def point_main_at(main, original, root, csv_dir, urls, workers):
+    """
+    Repoint main's output files at root and reopen its stores and clients.
+    Paths are rewritten from original, a copy of main.CONFIG taken before
+    the first call, so every call starts from the real paths.
+    """
+    for key, value in original.items():
+        if isinstance(value, str) and value.startswith(main.BASE_DIR):
+            main.CONFIG[key] = root + value[len(main.BASE_DIR):]
+    main.CONFIG["csv_dir"] = csv_dir
+    main.CONFIG["urls"] = urls
+    main.CONFIG["scrape_delay"] = 0
+    main.CONFIG["scrape_workers"] = workers
+    main.store = main.open_store()
+    main.dedup = main.DedupIndex(main.CONFIG["dedup_index_path"])
+    main.stats = main.StoreStats(main.CONFIG["stats_path"])
+    main.search_index = main.InvertedIndex(main.CONFIG["search_index_dir"])
+    main.near_dups = main.NearDupIndex(
+        main.CONFIG["near_dup_index_path"], threshold=main.CONFIG["near_dup_threshold"]
+    )
+
+    main._clients.clear()
+
+
+def bench_store_sizes(server, urls, csv_dir, sizes, records, workers):
+    import main
+
+    cases = {}
+    original = dict(main.CONFIG)
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as root:
+            point_main_at(main, original, root, csv_dir, urls, workers)
+            seed_seconds = 0.0
+            if size:
+                batches = (
+                    synthetic_records(min(SEED_BATCH, size - start), start=start, source="seed")
+                    for start in range(0, size, SEED_BATCH)
+                )
+                seed_seconds, _ = timed(lambda: main.append_batches(batches, "seed"))
+
+            new = synthetic_records(records, start=size, source="bench")
+            seconds, _ = timed(lambda: main.append_data(new, "bench"))
+            cases[f"append_data[store={size}]"] = result(seconds, records, seed_seconds=round(seed_seconds, 2))
+
+            with fake_newsapi(server):
+                seconds, report = timed(lambda: main.run_sources(main.fetcher_names()))
+            written = sum((entry["run"] or {}).get("written", 0) for entry in report.values())
+            cases[f"run_all[store={size}]"] = result(
+                seconds,
+                written,
+                sources={source: entry["status"] for source, entry in report.items()},
+            )
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--page-bytes", type=int, default=20_000)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of pages answered with a 500")
+    parser.add_argument("--no-etag", action="store_true", help="serve pages without ETags")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--csv-files", type=int, default=4)
+    parser.add_argument("--csv-rows", type=int, default=20_000)
+    parser.add_argument("--encoding", default="utf-8")
+    parser.add_argument("--records", type=int, default=5_000, help="records per append_data call")
+    parser.add_argument("--store-sizes", default="0,10000,50000")
+    parser.add_argument("--json", dest="json_path")
+    parser.add_argument("--baseline")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.store_sizes.split(",") if size]
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    server = StandInServer(
+        page_bytes=args.page_bytes,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        etag=not args.no_etag,
+    )
+    results = {}
+    with server, tempfile.TemporaryDirectory() as tmp:
+        urls = server.page_urls(args.pages)
+        csv_dir = os.path.join(tmp, "csv")
+        paths = write_csv_dir(csv_dir, args.csv_files, args.csv_rows, args.encoding)
+
+        results.update(bench_web(server, urls, os.path.join(tmp, "page_cache"), args.workers))
+        results.update(bench_csv(paths))
+        results.update(bench_store_sizes(server, urls, csv_dir, sizes, args.records, args.workers))
+
+    for case, entry in results.items():
+        line = f"{case:<28} {entry['seconds']:9.3f}s {entry['items']:>8} items"
+        if entry["per_second"] is not None:
+            line += f" {entry['per_second']:>10.1f}/s"
+        if case in baseline:
+            before = baseline[case]["seconds"]
+            change = (entry["seconds"] - before) / before * 100 if before else 0.0
+            line += f"   (baseline {before:.3f}s, {change:+.1f}%)"
+        print(line)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "parameters": vars(args),
+                "server": {
+                    "requests": server.requests,
+                    "not_modified": server.not_modified,
+                    "errors": server.errors,
+                },
+                "results": results,
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Build an InvertedIndex over synthetic records and time ranked queries.
+
+    python -m benchmarks.bench_search [--records N] [--batch N] [--queries N]
+
+Words follow a Zipf-like distribution so the index has both very common
+terms (long posting lists) and rare ones. Reports build throughput, index
+size on disk and query latency percentiles with and without filters.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+from storage.search import InvertedIndex
+
+SOURCES = ("newsapi", "web", "csv")
+
+
+def vocabulary(size):
+    rng = random.Random(7)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 9))))
+    return sorted(words)
+
+
+def synthetic_records(count, words, seed=1):
+    rng = random.Random(seed)
+    cumulative, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        picks = rng.choices(words, cum_weights=cumulative, k=40)
+        timestamp = start + timedelta(minutes=i % (365 * 24 * 60))
+        yield {
+            "_id": f"bench_{i}",
+            "_source": SOURCES[i % len(SOURCES)],
+            "_timestamp": timestamp.isoformat(),
+            "title": " ".join(picks[:6]),
+            "content": " ".join(picks[6:]),
+            "url": f"https://example.com/{i}",
+        }
+
+
+def batched(records, size):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def time_queries(index, queries, **filters):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, **filters)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000, help="records per append")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    words = vocabulary(args.vocabulary)
+    rng = random.Random(3)
+    queries = {
+        "rare term": [rng.choice(words[5000:]) for _ in range(args.queries)],
+        "mid term": [rng.choice(words[100:1000]) for _ in range(args.queries)],
+        "two terms": [
+            f"{rng.choice(words[100:1000])} {rng.choice(words[1000:])}"
+            for _ in range(args.queries)
+        ],
+        "common term": [rng.choice(words[:10]) for _ in range(max(1, args.queries // 10))],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index = InvertedIndex(os.path.join(tmp, "index"))
+
+        start = time.perf_counter()
+        for batch in batched(synthetic_records(args.records, words), args.batch):
+            index.add(batch)
+        build_time = time.perf_counter() - start
+
+        size_mb = sum(
+            os.path.getsize(os.path.join(index.root, name)) for name in os.listdir(index.root)
+        ) / 1e6
+        print(
+            f"Indexed {len(index)} records in {build_time:.1f}s "
+            f"({len(index) / build_time:,.0f} records/s), {size_mb:.1f} MB on disk, "
+            f"{len(index._meta['segments'])} segments\n"
+        )
+
+        # Reopen so the first query pays for loading the doc arrays and term dictionaries
+        index = InvertedIndex(index.root)
+        start = time.perf_counter()
+        index.search(words[5000])
+        print(f"cold first query: {(time.perf_counter() - start) * 1000:8.1f} ms\n")
+
+        filters = {
+            "no filter": {},
+            "source=web": {"source": "web"},
+            "one month": {"since": "2024-03-01", "until": "2024-04-01"},
+        }
+        print(f"{'query':<12} {'filter':<12} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for label, batch in queries.items():
+            for filter_label, kwargs in filters.items():
+                latencies = time_queries(index, batch, **kwargs)
+                print(
+                    f"{label:<12} {filter_label:<12} {percentile(latencies, 50):9.2f} "
+                    f"{percentile(latencies, 95):9.2f} {max(latencies):9.2f}"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Offline stand-ins for the ingestion sources, shared by the benchmarks.
+
+StandInServer serves synthetic HTML pages and a fake NewsAPI sources
+endpoint from a local thread, so scraping and API calls can be timed
+without touching the network:
+
+    with StandInServer(page_bytes=50_000, latency=0.02, error_rate=0.05) as server:
+        urls = server.page_urls(200)
+        with fake_newsapi(server):
+            ...
+
+write_csv_dir and synthetic_records generate CSV input and stored records.
+"""
+import os
+import csv
+import json
+import time
+import zlib
+import random
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import newsapi.const
+
+WORDS = (
+    "battery cell voltage charge grid storage lithium sodium solid state "
+    "anode cathode market supply factory price energy solar wind vehicle "
+    "range density cycle thermal safety recycling cost demand policy"
+).split()
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def synthetic_page(n, size):
+    """A deterministic HTML page of about size bytes."""
+    rng = random.Random(n)
+    head = (
+        f"<html><head><title>Page {n}: {_sentence(rng, 5)}</title>"
+        "<style>p{margin:0}</style></head><body><nav>Home | News | About</nav>"
+        f"<h1>{_sentence(rng, 6)}</h1>"
+    )
+    tail = "<footer>Footer</footer></body></html>"
+    paragraphs = []
+    length = len(head) + len(tail)
+    while length < size:
+        paragraph = f"<p>{_sentence(rng)} <a href='/page/{rng.randrange(1000)}'>more</a></p>"
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return (head + "".join(paragraphs) + tail).encode("utf-8")
+
+
+class StandInServer:
+    """
+    Local HTTP server for GET /page/<n> and /v2/top-headlines/sources.
+
+    latency seconds are slept before every response, error_rate is the
+    fraction of page requests answered with a 500, and with etag=True pages
+    carry an ETag and matching If-None-Match requests get a 304.
+    """
+
+    def __init__(self, page_bytes=20_000, latency=0.0, error_rate=0.0, etag=True, sources=100, seed=1):
+        self.page_bytes = page_bytes
+        self.latency = latency
+        self.error_rate = error_rate
+        self.etag = etag
+        self.sources = sources
+        self.requests = 0
+        self.not_modified = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # -------------------------
+    # Lifecycle
+    # -------------------------
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stand-in-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def page_urls(self, count):
+        return [f"{self.base_url}/page/{n}" for n in range(count)]
+
+    # -------------------------
+    # Responses
+    # -------------------------
+    def _page(self, n):
+        # Regenerated per request, so the server adds nothing to memory
+        # measurements of the client it runs in
+        body = synthetic_page(n, self.page_bytes)
+        return body, f'"{zlib.crc32(body):08x}"'
+
+    def _fails(self):
+        with self._lock:
+            self.requests += 1
+            failed = self._rng.random() < self.error_rate
+            self.errors += failed
+            return failed
+
+    def sources_payload(self):
+        rng = random.Random(self.sources)
+        return {
+            "status": "ok",
+            "sources": [
+                {
+                    "id": f"source-{i}",
+                    "name": f"Source {i}",
+                    "description": _sentence(rng),
+                    "url": f"https://source-{i}.example.com",
+                    "category": rng.choice(("business", "technology", "science")),
+                    "language": "en",
+                    "country": rng.choice(("us", "gb", "de")),
+                }
+                for i in range(self.sources)
+            ],
+        }
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real hosts
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body=b"", headers=None):
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                path = self.path.split("?", 1)[0]
+
+                if path == "/v2/top-headlines/sources":
+                    body = json.dumps(server.sources_payload()).encode("utf-8")
+                    self._send(200, body, {"Content-Type": "application/json"})
+                    return
+
+                if not path.startswith("/page/") or not path[6:].isdigit():
+                    self._send(404, b"not found")
+                    return
+                if server._fails():
+                    self._send(500, b"synthetic failure")
+                    return
+
+                body, etag = server._page(int(path[6:]))
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if server.etag:
+                    headers["ETag"] = etag
+                    if self.headers.get("If-None-Match") == etag:
+                        with server._lock:
+                            server.not_modified += 1
+                        self._send(304, headers={"ETag": etag})
+                        return
+                self._send(200, body, headers)
+
+        return Handler
+
+
+@contextmanager
+def fake_newsapi(server, api_key="benchmark"):
+    """Point the newsapi client at server and provide an API key."""
+    original_url = newsapi.const.SOURCES_URL
+    original_key = os.environ.get("NEWS_API_KEY")
+    newsapi.const.SOURCES_URL = f"{server.base_url}/v2/top-headlines/sources"
+    os.environ["NEWS_API_KEY"] = api_key
+    try:
+        yield
+    finally:
+        newsapi.const.SOURCES_URL = original_url
+        if original_key is None:
+            os.environ.pop("NEWS_API_KEY", None)
+        else:
+            os.environ["NEWS_API_KEY"] = original_key
+
+
+def write_csv_dir(directory, files=4, rows=10_000, encoding="utf-8", seed=1):
+    """
+    Write files CSVs of rows rows each. Non-UTF-8 encodings get accented
+    text so the encoding detection has something to find.
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    accented = encoding.replace("_", "-").lower() not in ("utf-8", "utf8", "ascii")
+    paths = []
+    for f in range(files):
+        path = os.path.join(directory, f"bench_{f}.csv")
+        with open(path, "w", newline="", encoding=encoding) as out:
+            writer = csv.writer(out)
+            writer.writerow(["title", "content", "author", "url"])
+            for i in range(rows):
+                title = _sentence(rng, 6)
+                if accented and i % 10 == 0:
+                    title += " Café déjà vu"
+                writer.writerow([title, _sentence(rng, 30), f"author {i % 50}", f"https://csv.example.com/{f}/{i}"])
+        paths.append(path)
+    return paths
+
+
+def synthetic_records(count, start=0, source="bench", seed=1):
+    """Distinct records shaped like fetcher output (stamping adds _id)."""
+    rng = random.Random(seed + start)
+    return [
+        {
+            "title": f"Record {i}: {_sentence(rng, 6)}",
+            "content": f"{i} " + _sentence(rng, 40),
+            "url": f"https://{source}.example.com/{i}",
+            "source": source,
+        }
+        for i in range(start, start + count)
+    ]
@@ -0,0 +1,95 @@
+import os
+import time
+from functools import partial
+
+from fetchers.csv_reader import CSVToJSON, detect_encoding, record_end
+from fetchers.csv_parallel import iter_csv_files
+from fetchers.csv_manifest import CSVManifest
+from pipeline.memory import budget_batch_size
+
+CSV_ROW_BYTES = 2048  # in memory, for sizing batches under a memory budget
+
+
+class CSVFetcher:
+    """
+    Registry entry for the CSV directory. collect() yields batches of rows,
+    with a manifest checkpoint (callable) after each file; the writer runs a
+    checkpoint once every batch before it is stored.
+    """
+
+    def __init__(self, config, get_session=None):
+        self.config = config
+
+    def collect(self):
+        config = self.config
+        if not os.path.isdir(config["csv_dir"]):
+            print("✗ CSV directory not found")
+            return None
+
+        manifest = CSVManifest(config["csv_manifest_path"]) if config["csv_incremental"] else None
+
+        spans = {}
+        for file in os.listdir(config["csv_dir"]):
+            if not file.endswith(".csv"):
+                continue
+            path = os.path.join(config["csv_dir"], file)
+            if not manifest:
+                spans[path] = (0, None)
+                continue
+
+            start, end, status = manifest.plan(path)
+            if status == "unchanged":
+                print(f"✓ {file}: unchanged, skipped")
+                continue
+            if status == "grown":
+                print(f"✓ {file}: grew, resuming at byte {start}")
+            elif status == "rewritten":
+                print(f"⚠ {file}: rewritten, re-ingesting")
+
+            # A row still being written would be committed half read; stop
+            # at the last complete record unless the file has gone quiet
+            settled = time.time() - os.path.getmtime(path) >= config.get("csv_settle_seconds", 0)
+            if not settled:
+                end = record_end(path, detect_encoding(path), start, end)
+                if end <= start:
+                    print(f"✓ {file}: no complete rows yet, skipped")
+                    continue
+            spans[path] = (start, end)
+
+        def tag(path, rows):
+            for r in rows:
+                r["csv_file"] = os.path.basename(path)
+            return rows
+
+        budget_mb = config.get("memory_budget_mb")
+        batch_size = budget_batch_size(config["csv_batch_size"], budget_mb, CSV_ROW_BYTES)
+        # Worker chunks arrive as one list of rows, roughly 4x their bytes in memory
+        chunk_bytes = config["csv_chunk_bytes"]
+        if budget_mb:
+            chunk_bytes = min(chunk_bytes, max(1024 * 1024, int(budget_mb * 1024 * 1024 / 16)))
+
+        def serial_batches():
+            for path, (start, end) in spans.items():
+                reader = CSVToJSON(path, start_offset=start, end_offset=end)
+                for rows in reader.iter_batches(batch_size):
+                    yield tag(path, rows)
+                if manifest and not reader.failed:
+                    yield partial(manifest.commit, path, reader.end_offset)
+
+        def parallel_batches():
+            parsed = iter_csv_files(
+                list(spans), config["csv_workers"], chunk_bytes, spans
+            )
+            previous = None
+            failed = set()
+            for path, rows, path_failed in parsed:
+                if manifest and previous not in (None, path) and previous not in failed:
+                    yield partial(manifest.commit, previous, spans[previous][1])
+                previous = path
+                if path_failed:
+                    failed.add(path)
+                yield tag(path, rows)
+            if manifest and previous is not None and previous not in failed:
+                yield partial(manifest.commit, previous, spans[previous][1])
+
+        return parallel_batches() if config["csv_workers"] else serial_batches()
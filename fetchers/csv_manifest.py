@@ -0,0 +1,116 @@
+import os
+import json
+import hashlib
+
+HEADER_SCAN_BYTES = 1024 * 1024
+TAIL_BYTES = 4096
+
+
+def header_hash(csv_file) -> str:
+    """Hash of the raw bytes of the header record (quoted newlines included)."""
+    with open(csv_file, "rb") as f:
+        head = f.read(HEADER_SCAN_BYTES)
+
+    in_quotes = False
+    pos = 0
+    while True:
+        newline = head.find(b"\n", pos)
+        if newline == -1:
+            end = len(head)
+            break
+        in_quotes ^= bool(head.count(b'"', pos, newline) & 1)
+        if not in_quotes:
+            end = newline + 1
+            break
+        pos = newline + 1
+    return hashlib.sha1(head[:end]).hexdigest()
+
+
+def tail_hash(csv_file, offset) -> str:
+    """Hash of the bytes just before offset, to catch in-place rewrites."""
+    with open(csv_file, "rb") as f:
+        f.seek(max(0, offset - TAIL_BYTES))
+        return hashlib.sha1(f.read(min(offset, TAIL_BYTES))).hexdigest()
+
+
+class CSVManifest:
+    """
+    Remembers how far each CSV file has been ingested: path, size, mtime,
+    inode, header hash and the byte offset after the last consumed row.
+
+    plan() classifies a file as new, unchanged, grown or rewritten and returns
+    the byte range still to ingest; commit() records the new offset once that
+    range has been stored.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        self._planned = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.entries = {}
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.entries = {}
+        self._planned = {}
+        self.save()
+
+    def plan(self, csv_file):
+        """Return (start_offset, end_offset, status) for csv_file."""
+        key = os.path.abspath(csv_file)
+        stat = os.stat(csv_file)
+        current = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "inode": stat.st_ino,
+            "header_hash": header_hash(csv_file) if stat.st_size else None,
+        }
+        self._planned[key] = current
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0, stat.st_size, "new"
+
+        same_file = (
+            entry["inode"] == current["inode"]
+            and entry["header_hash"] == current["header_hash"]
+        )
+        if same_file and (entry["size"], entry["mtime_ns"]) == (
+            current["size"],
+            current["mtime_ns"],
+        ):
+            return entry["offset"], entry["offset"], "unchanged"
+
+        offset = entry["offset"]
+        if (
+            same_file
+            and current["size"] > offset
+            and entry.get("tail_hash") == tail_hash(csv_file, offset)
+        ):
+            return offset, current["size"], "grown"
+
+        return 0, stat.st_size, "rewritten"
+
+    def commit(self, csv_file, offset):
+        """Record that csv_file has been ingested up to offset."""
+        key = os.path.abspath(csv_file)
+        entry = dict(self._planned.pop(key))
+        entry["offset"] = offset
+        entry["tail_hash"] = tail_hash(csv_file, offset)
+        self.entries[key] = entry
+        self.save()
@@ -0,0 +1,177 @@
+import io
+import os
+import csv
+import mmap
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from fetchers.csv_reader import CSVToJSON, detect_encoding
+from pipeline.metrics import counter
+
+COUNT_BLOCK = 1024 * 1024
+
+
+def _is_ascii_compatible(encoding) -> bool:
+    """Byte-range splitting needs quotes and newlines to be single ASCII bytes."""
+    try:
+        return '\n",'.encode(encoding) == b'\n",'
+    except LookupError:
+        return False
+
+
+def _count_quotes(mm, start, end) -> int:
+    quotes = 0
+    for block in range(start, end, COUNT_BLOCK):
+        quotes += mm[block:min(block + COUNT_BLOCK, end)].count(b'"')
+    return quotes
+
+
+def _next_record_start(mm, pos, in_quotes, end=None):
+    """
+    First offset at or after pos that begins a new record, given whether pos
+    itself is inside a quoted field. Newlines inside quotes are skipped.
+    """
+    end = len(mm) if end is None else end
+    while True:
+        newline = mm.find(b"\n", pos, end)
+        if newline == -1:
+            return end
+        in_quotes ^= _count_quotes(mm, pos, newline) & 1
+        if not in_quotes:
+            return newline + 1
+        pos = newline + 1
+
+
+def record_boundaries(mm, data_start, chunk_bytes, end=None):
+    """
+    Split mm[data_start:end] into ranges of roughly chunk_bytes that start and
+    end on record boundaries. Quote parity is tracked from data_start, which
+    must itself be a record boundary.
+    """
+    size = len(mm) if end is None else end
+    bounds = [data_start]
+    pos = data_start
+    in_quotes = 0
+
+    while bounds[-1] + chunk_bytes < size:
+        target = bounds[-1] + chunk_bytes
+        in_quotes ^= _count_quotes(mm, pos, target) & 1
+        boundary = _next_record_start(mm, target, in_quotes, size)
+        if boundary >= size:
+            break
+        bounds.append(boundary)
+        pos = boundary
+        in_quotes = 0
+
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _parse_range(path, start, end, encoding, fieldnames):
+    """Worker: parse one record-aligned byte range of a CSV file."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode(encoding)
+
+    rows = []
+    for row in csv.DictReader(io.StringIO(text, newline=""), fieldnames=fieldnames):
+        if not any(row.values()):
+            continue  # skip empty rows
+        row["source"] = "csv"
+        rows.append(row)
+    return rows
+
+
+def _read_whole_file(path, start=0, end=None):
+    """Worker: parse a whole file (or its unread tail) the regular way."""
+    reader = CSVToJSON(path, start_offset=start, end_offset=end)
+    return reader.read_csv(), reader.failed
+
+
+def _plan_file(path, chunk_bytes, start=0, end=None):
+    """
+    Return the worker jobs for bytes [start, end) of one file: record-aligned
+    ranges for large spans in an ASCII-compatible encoding, otherwise a
+    single job for the regular reader.
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    end = size if end is None else min(end, size)
+    whole = [(_read_whole_file, (path, start, end))]
+    if end - start <= chunk_bytes:
+        return whole
+
+    encoding = detect_encoding(path)
+    if not _is_ascii_compatible(encoding):
+        return whole
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header_end = _next_record_start(mm, 0, 0)
+        header = mm[:header_end].decode(encoding)
+        fieldnames = next(csv.reader(io.StringIO(header, newline="")), None)
+        if not fieldnames:
+            return whole
+        # Offsets from the manifest always sit on a record boundary
+        ranges = record_boundaries(mm, max(start, header_end), chunk_bytes, end)
+
+    return [
+        (_parse_range, (path, start, end, encoding, fieldnames))
+        for start, end in ranges
+    ]
+
+
+def iter_csv_files(paths, workers=None, chunk_bytes=32 * 1024 * 1024, ranges=None):
+    """
+    Parse CSV files in a process pool and yield (path, rows, failed) in the
+    original file and row order; failed is True if that part of the file
+    could not be parsed. Files are parsed concurrently; a file larger than
+    chunk_bytes is split into record-aligned byte ranges parsed by separate
+    workers. At most two jobs per worker are outstanding at a time.
+    ranges optionally maps a path to the (start, end) byte span to read.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = ranges or {}
+    jobs = (
+        (path, job)
+        for path in paths
+        for job in _plan_file(path, chunk_bytes, *ranges.get(path, (0, None)))
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for path, (fn, args) in jobs:
+            pending.append((path, args, pool.submit(fn, *args)))
+            if len(pending) >= workers * 2:
+                yield _collect(*pending.popleft())
+        while pending:
+            yield _collect(*pending.popleft())
+
+
+def _collect(path, args, future):
+    try:
+        try:
+            result = future.result()
+        except UnicodeDecodeError:
+            # The sampled encoding was wrong for this range; the reader retries others
+            print(f"⚠ Falling back to serial read for {os.path.basename(path)}")
+            result = _retry_range(path, args)
+    except Exception as e:
+        # Only this file fails (and skips its manifest commit), as in CSVToJSON
+        print(f"❌ Error processing CSV {os.path.basename(path)}: {e}")
+        result = [], True
+    rows, failed = result if isinstance(result, tuple) else (result, False)
+    counter("csv_rows_total", "CSV rows read", file=os.path.basename(path)).inc(len(rows))
+    return path, rows, failed
+
+
+def _retry_range(path, args):
+    if len(args) == 3:
+        return _read_whole_file(*args)
+
+    _, start, end, _, fieldnames = args
+    for encoding in CSVToJSON.ENCODINGS:
+        if not _is_ascii_compatible(encoding):
+            continue
+        try:
+            return _parse_range(path, start, end, encoding, fieldnames)
+        except UnicodeDecodeError:
+            continue
+    return [], True
@@ -1,15 +1,169 @@
+import io
 import csv
+import mmap
+import codecs
 import json
 import os
+import time
+
+from charset_normalizer import from_bytes
+
+from pipeline.metrics import counter, histogram
+
+KNOWN_ENCODINGS = ["utf-8", "latin-1", "cp1252", "iso-8859-1", "utf-16"]
+SAMPLE_BYTES = 64 * 1024
+BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),  # before UTF-16 LE, which shares its prefix
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# (absolute path, mtime_ns, size) -> encoding
+_encoding_cache = {}
+
+
+def _is_utf8(sample: bytes, final: bool) -> bool:
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=final)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
+def _sniff_encoding(head: bytes, tail: bytes, whole_file: bool) -> str:
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding
+
+    # A tail sample may start in the middle of a multi-byte character
+    tail = tail.lstrip(bytes(range(0x80, 0xC0)))
+    if _is_utf8(head, final=whole_file) and _is_utf8(tail, final=True):
+        return "utf-8"
+
+    # Only consider encodings we'd otherwise fall back to anyway
+    best = from_bytes(head + tail, cp_isolation=KNOWN_ENCODINGS).best()
+    return best.encoding if best else "latin-1"
+
+
+def detect_encoding(csv_file: str) -> str:
+    """
+    Guess the encoding of csv_file from its first and last SAMPLE_BYTES.
+    The answer is cached until the file's size or mtime changes.
+    """
+    stat = os.stat(csv_file)
+    key = (os.path.abspath(csv_file), stat.st_mtime_ns, stat.st_size)
+    if key in _encoding_cache:
+        return _encoding_cache[key]
+
+    with open(csv_file, "rb") as f:
+        head = f.read(SAMPLE_BYTES)
+        tail = b""
+        if stat.st_size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            tail = f.read()
+
+    encoding = _sniff_encoding(head, tail, whole_file=stat.st_size <= SAMPLE_BYTES)
+    _encoding_cache[key] = encoding
+    return encoding
+
+
+def remember_encoding(csv_file: str, encoding: str):
+    stat = os.stat(csv_file)
+    _encoding_cache[(os.path.abspath(csv_file), stat.st_mtime_ns, stat.st_size)] = encoding
+
+
+def _last_record_end(buf, start, end, newline, quote, count):
+    """Scan back from end for a newline with an even number of quotes before it."""
+    parity = count(quote, start, end) & 1
+    pos = end
+    while True:
+        found = buf.rfind(newline, start, pos)
+        if found == -1:
+            return start
+        parity ^= count(quote, found, pos) & 1
+        if not parity:
+            return found + len(newline)
+        pos = found
+
+
+def record_end(csv_file: str, encoding: str, start: int, end: int) -> int:
+    """
+    Offset just past the last complete record in bytes [start, end): the
+    last newline outside quotes. start must be a record boundary. A row
+    still being written is left out, so it is read whole on the next run.
+    """
+    if end <= start:
+        return start
+    encoding = _resume_encoding(csv_file, encoding)
+    try:
+        newline, quote = "\n".encode(encoding), '"'.encode(encoding)
+    except LookupError:
+        return end
+
+    with open(csv_file, "rb") as f:
+        if len(newline) == 1:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                def count(sub, lo, hi):
+                    return sum(
+                        mm[block:min(block + SAMPLE_BYTES, hi)].count(sub)
+                        for block in range(lo, hi, SAMPLE_BYTES)
+                    )
+                return _last_record_end(mm, start, min(end, len(mm)), newline, quote, count)
+
+        # UTF-16/32: search the decoded text, then map back to bytes
+        f.seek(start)
+        text = f.read(end - start).decode(encoding, errors="replace")
+    cut = _last_record_end(text, 0, len(text), "\n", '"', text.count)
+    return start + len(text[:cut].encode(encoding))
+
+
+class _RangeReader(io.RawIOBase):
+    """Raw reader over file bytes [start, end), so rows appended mid-read are left for next time."""
+
+    def __init__(self, f, start, end):
+        self._f = f
+        self._end = end
+        f.seek(start)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:remaining]
+        return self._f.readinto(view)
+
+
+def _resume_encoding(csv_file, encoding):
+    """Decoding from the middle of a UTF-16/32 file needs the byte order from its BOM."""
+    if encoding not in ("utf-16", "utf-32"):
+        return encoding
+    with open(csv_file, "rb") as f:
+        head = f.read(4)
+    if encoding == "utf-32":
+        return "utf-32-be" if head.startswith(codecs.BOM_UTF32_BE) else "utf-32-le"
+    return "utf-16-be" if head.startswith(codecs.BOM_UTF16_BE) else "utf-16-le"
 
 
 class CSVToJSON:
-    ENCODINGS = ["utf-8", "latin-1", "cp1252", "iso-8859-1", "utf-16"]
+    ENCODINGS = KNOWN_ENCODINGS
 
-    def __init__(self, csv_file: str, required_columns=None):
+    def __init__(self, csv_file: str, required_columns=None, start_offset=0, end_offset=None):
+        """
+        start_offset resumes reading at a byte offset that begins a record (the
+        header is still taken from the top of the file); end_offset stops at a
+        byte offset, defaulting to the file size when reading starts.
+        """
         self.csv_file = csv_file
         self.required_columns = required_columns or []
+        self.start_offset = start_offset
+        self.end_offset = end_offset
         self.data = []
+        self.failed = False
 
     def _validate_file(self):
         if not os.path.exists(self.csv_file):
@@ -28,43 +182,111 @@ class CSVToJSON:
 
     def read_csv(self) -> list:
         """Read CSV and return data as list of dictionaries"""
+        data = [row for batch in self.iter_batches() for row in batch]
+        if self.failed:
+            return []
+
+        self.data = data
+        return data
+
+    def iter_batches(self, batch_size: int = 1000):
+        """
+        Yield rows as lists of at most batch_size dictionaries, so memory stays
+        flat regardless of file size. Sets self.failed if the file could not
+        be read completely.
+        """
+        self.failed = False
         try:
             self._validate_file()
         except Exception as e:
             print(f"❌ {e}")
-            return []
+            self.failed = True
+            return
+
+        if self.end_offset is None:
+            self.end_offset = os.path.getsize(self.csv_file)
 
-        for encoding in self.ENCODINGS:
+        detected = detect_encoding(self.csv_file)
+        candidates = [detected] + [e for e in self.ENCODINGS if e != detected]
+
+        name = os.path.basename(self.csv_file)
+        rows = counter("csv_rows_total", "CSV rows read", file=name)
+        busy = 0.0  # time spent reading, not waiting for the consumer
+        resumed = time.perf_counter()
+
+        emitted = 0
+        for encoding in candidates:
             try:
-                with open(self.csv_file, newline="", encoding=encoding) as csvfile:
-                    reader = csv.DictReader(csvfile)
-                    
-                    self._validate_columns(reader.fieldnames)
-                    
-                    data = []
-                    for row in reader:
-                        if not any(row.values()):
-                            continue  # skip empty rows
-                        
-                        row["source"] = "csv"
-                        data.append(row)
-                
-                if not data:
+                # Rows already yielded under a wrong guess are not repeated
+                for batch in self._iter_with(encoding, batch_size, skip=emitted):
+                    busy += time.perf_counter() - resumed
+                    emitted += len(batch)
+                    rows.inc(len(batch))
+                    yield batch
+                    resumed = time.perf_counter()
+
+                if not emitted and not self.start_offset:
                     raise ValueError("CSV contains no valid data rows")
-                
-                self.data = data
+
+                if encoding != detected:
+                    remember_encoding(self.csv_file, encoding)
+
+                busy += time.perf_counter() - resumed
+                histogram("csv_read_seconds", "Time to read one CSV file", file=name).observe(busy)
+                counter("csv_bytes_total", "CSV bytes read", file=name).inc(
+                    self.end_offset - self.start_offset
+                )
+
                 print(f"✓ CSV read successfully using {encoding}")
-                print(f"✓ Found {len(data)} records")
-                return data
-                
-            except UnicodeDecodeError:
-                continue  # try next encoding
+                print(f"✓ Found {emitted} records")
+                return
+
+            except (UnicodeDecodeError, LookupError):
+                continue  # sample was misleading, try next encoding
             except Exception as e:
                 print(f"❌ Error processing CSV: {e}")
-                return []
-        
+                self.failed = True
+                return
+
         print("❌ Failed to decode CSV with known encodings")
-        return []
+        self.failed = True
+
+    def _read_header(self, encoding):
+        with open(self.csv_file, newline="", encoding=encoding) as csvfile:
+            return next(csv.reader(csvfile), None)
+
+    def _iter_with(self, encoding, batch_size, skip=0):
+        fieldnames = None
+        if self.start_offset:
+            fieldnames = self._read_header(encoding)
+            self._validate_columns(fieldnames)
+            encoding = _resume_encoding(self.csv_file, encoding)
+
+        with open(self.csv_file, "rb") as raw:
+            stream = io.BufferedReader(
+                _RangeReader(raw, self.start_offset, self.end_offset)
+            )
+            csvfile = io.TextIOWrapper(stream, encoding=encoding, newline="")
+            reader = csv.DictReader(csvfile, fieldnames=fieldnames)
+
+            self._validate_columns(reader.fieldnames)
+
+            batch = []
+            for row in reader:
+                if not any(row.values()):
+                    continue  # skip empty rows
+                if skip:
+                    skip -= 1
+                    continue
+
+                row["source"] = "csv"
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+
+            if batch:
+                yield batch
 
     def convert(self) -> list:
         """Main method to convert CSV to data (no saving)"""
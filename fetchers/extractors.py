@@ -0,0 +1,146 @@
+from html.parser import HTMLParser
+
+from bs4 import BeautifulSoup
+
+NOISE_TAGS = ("script", "style", "nav", "footer", "header", "aside")
+TITLE_TAGS = ("h1", "title", "h2")  # in order of preference
+CONTENT_LIMIT = 1000
+FEED_CHUNK = 64 * 1024
+
+
+class BoundedTextParser(HTMLParser):
+    """
+    Event-driven extractor that collects the title candidates and the first
+    content_limit characters of visible text, then reports itself done so the
+    caller can stop feeding the rest of the page.
+    """
+
+    def __init__(self, content_limit=CONTENT_LIMIT):
+        super().__init__(convert_charrefs=True)
+        self.content_limit = content_limit
+        self.title_lookahead = content_limit * 4
+        self.titles = {}
+        self.words = []
+        self.text_length = 0
+        self._noise_depth = 0
+        self._capture_tag = None
+        self._capture = []
+
+    @property
+    def done(self):
+        if self.text_length < self.content_limit:
+            return False
+        if "h1" in self.titles:
+            return True
+        # Settle for a weaker title once we've looked well past the content budget
+        return bool(self.titles) and self.text_length >= self.title_lookahead
+
+    def handle_starttag(self, tag, attrs):
+        if tag in NOISE_TAGS:
+            self._noise_depth += 1
+        elif (
+            not self._noise_depth
+            and self._capture_tag is None
+            and tag in TITLE_TAGS
+            and tag not in self.titles
+        ):
+            self._capture_tag = tag
+            self._capture = []
+
+    def handle_endtag(self, tag):
+        if tag in NOISE_TAGS:
+            self._noise_depth = max(0, self._noise_depth - 1)
+        elif tag == self._capture_tag:
+            self.titles[tag] = "".join(part.strip() for part in self._capture)
+            self._capture_tag = None
+
+    def handle_data(self, data):
+        if self._noise_depth:
+            return
+        if self._capture_tag:
+            self._capture.append(data)
+
+        for word in data.split():
+            if self.text_length < self.content_limit:
+                self.words.append(word)
+            self.text_length += len(word) + 1
+
+    def result(self):
+        title = next(
+            (self.titles[tag] for tag in TITLE_TAGS if self.titles.get(tag)),
+            "No Title Found",
+        )
+        content = " ".join(self.words)[: self.content_limit]
+        return title, content
+
+
+class SoupExtractor:
+    """Builds the full BeautifulSoup tree, then strips noise and reads the text."""
+
+    name = "soup"
+
+    def __init__(self, parser="html.parser", content_limit=CONTENT_LIMIT):
+        self.parser = parser
+        self.content_limit = content_limit
+
+    def extract(self, html: str):
+        soup = BeautifulSoup(html, self.parser)
+
+        # Remove noise
+        for tag in soup(list(NOISE_TAGS)):
+            tag.decompose()
+
+        # Find a Title
+        title_tag = (
+            soup.find("h1")
+            or soup.find("title")
+            or soup.find("h2")
+        )
+        title = title_tag.get_text(strip=True) if title_tag else "No Title Found"
+
+        # Clean content
+        content = " ".join(
+            soup.get_text(separator=" ", strip=True).split()
+        )[: self.content_limit]
+        return title, content
+
+
+class StreamExtractor:
+    """Single pass over the html.parser event stream; no tree is built."""
+
+    name = "stream"
+
+    def __init__(self, content_limit=CONTENT_LIMIT, early_stop=True):
+        self.content_limit = content_limit
+        self.early_stop = early_stop
+
+    def extract(self, html: str):
+        parser = BoundedTextParser(self.content_limit)
+        for start in range(0, len(html), FEED_CHUNK):
+            parser.feed(html[start:start + FEED_CHUNK])
+            if self.early_stop and parser.done:
+                break
+        else:
+            parser.close()
+        return parser.result()
+
+
+EXTRACTORS = {
+    SoupExtractor.name: SoupExtractor,
+    StreamExtractor.name: StreamExtractor,
+}
+
+
+def register_extractor(name, factory):
+    """Make an extractor backend selectable by name."""
+    EXTRACTORS[name] = factory
+
+
+def get_extractor(name, **options):
+    try:
+        factory = EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown extractor '{name}' (available: {', '.join(EXTRACTORS)})"
+        ) from None
+    return factory(**options)
@@ -8,38 +8,53 @@ import requests
 import time
 import sys
 
-# Load env variables
-load_dotenv()
-API_KEY = os.getenv("NEWS_API_KEY")
+from pipeline.metrics import counter, histogram
+
 TIMEOUT_SECONDS = 30
 MAX_RETRIES = 3
 
 # Remove the OUTPUT_DIR and OUTPUT_FILE constants - let the main script handle saving
 
 class NewsAPIHandler:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session=None):
         if not api_key:
             print("❌ Missing NewsAPI key")
             self.newsapi = None
             return
 
-        self.newsapi = NewsApiClient(api_key=api_key)
+        # A shared session keeps the connection to newsapi.org alive between calls
+        self.newsapi = NewsApiClient(api_key=api_key, session=session)
 
     def _make_api_call_with_retry(self, api_call, *args, **kwargs):
-        for attempt in range(MAX_RETRIES):
-            try:
-                return api_call(*args, **kwargs)
-            except requests.exceptions.Timeout:
-                print(f"⚠️ Timeout (attempt {attempt + 1}/{MAX_RETRIES})")
-                time.sleep(2 ** attempt)
-            except requests.exceptions.ConnectionError as e:
-                print(f"⚠️ Network error: {e}")
-                time.sleep(2 ** attempt)
-            except Exception as e:
-                print(f"❌ Request error: {e}")
-                break
+        endpoint = getattr(api_call, "__name__", "call")
+        with histogram(
+            "newsapi_request_seconds", "NewsAPI call time including retries", endpoint=endpoint
+        ).time():
+            for attempt in range(MAX_RETRIES):
+                try:
+                    response = api_call(*args, **kwargs)
+                    self._count_attempt(endpoint, "ok")
+                    return response
+                except requests.exceptions.Timeout:
+                    self._count_attempt(endpoint, "timeout")
+                    print(f"⚠️ Timeout (attempt {attempt + 1}/{MAX_RETRIES})")
+                    time.sleep(2 ** attempt)
+                except requests.exceptions.ConnectionError as e:
+                    self._count_attempt(endpoint, "conn_error")
+                    print(f"⚠️ Network error: {e}")
+                    time.sleep(2 ** attempt)
+                except Exception as e:
+                    self._count_attempt(endpoint, "error")
+                    print(f"❌ Request error: {e}")
+                    break
         return None
 
+    @staticmethod
+    def _count_attempt(endpoint, outcome):
+        counter(
+            "newsapi_attempts_total", "NewsAPI attempts by outcome", endpoint=endpoint, outcome=outcome
+        ).inc()
+
     def fetch_newsapi_sources(self):
         """
         Fetch news sources from NewsAPI and return as a list.
@@ -104,4 +119,37 @@ class NewsAPIHandler:
             return True
         except Exception as e:
             print(f"❌ Error saving to file: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+_env_loaded = False
+
+
+def load_env():
+    """Read .env on first use instead of at import."""
+    global _env_loaded
+    if not _env_loaded:
+        load_dotenv()
+        _env_loaded = True
+
+
+class NewsAPIFetcher:
+    """Registry entry for NewsAPI: one sources request per run, reusing the client."""
+
+    def __init__(self, config, get_session):
+        self.get_session = get_session
+        self.handler = None
+        self.api_key = None
+
+    def collect(self):
+        load_env()
+        api_key = os.getenv("NEWS_API_KEY")
+        if not api_key:
+            print("✗ NEWS_API_KEY not set")
+            return None
+
+        if self.handler is None or self.api_key != api_key:
+            self.handler = NewsAPIHandler(api_key, session=self.get_session())
+            self.api_key = api_key
+        data = self.handler.fetch_newsapi_sources()
+        return [data] if data else []
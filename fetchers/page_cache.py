@@ -0,0 +1,154 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class PageCache:
+    """
+    On-disk cache of scraped pages keyed by URL.
+    Keeps HTTP validators (ETag / Last-Modified) and a body hash per URL next
+    to the extracted result, so unchanged pages skip download and parsing.
+    Entries are evicted least-recently-used first once max_bytes is exceeded.
+    """
+
+    INDEX_FILE = "index.json"
+
+    def __init__(self, cache_dir: str, max_bytes: int = 50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()  # oldest first
+        self._total_bytes = 0
+        self._load_index()
+
+    # -------------------------
+    # Index persistence
+    # -------------------------
+    def _index_path(self):
+        return os.path.join(self.cache_dir, self.INDEX_FILE)
+
+    def _load_index(self):
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+
+        for url, entry in entries:
+            self._index[url] = entry
+            self._total_bytes += entry.get("size", 0)
+
+    def save(self):
+        """Persist the index in LRU order."""
+        with self._lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._index_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(list(self._index.items()), f)
+            os.replace(tmp_path, self._index_path())
+
+    def _entry_path(self, url):
+        name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.json")
+
+    # -------------------------
+    # Lookups
+    # -------------------------
+    @staticmethod
+    def fingerprint(body: bytes) -> str:
+        return hashlib.sha256(body).hexdigest()
+
+    def conditional_headers(self, url) -> dict:
+        """Headers that turn a GET for a cached URL into a conditional GET."""
+        with self._lock:
+            entry = self._index.get(url)
+        if not entry:
+            return {}
+
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def content_hash(self, url):
+        with self._lock:
+            entry = self._index.get(url)
+        return entry.get("content_hash") if entry else None
+
+    def get(self, url):
+        """Return the cached result for url and mark it recently used."""
+        with self._lock:
+            if url not in self._index:
+                return None
+            self._index.move_to_end(url)
+
+        try:
+            with open(self._entry_path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._drop(url)
+            return None
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def put(self, url, result, content_hash, etag=None, last_modified=None):
+        payload = json.dumps(result, ensure_ascii=False)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._entry_path(url), "w", encoding="utf-8") as f:
+            f.write(payload)
+
+        with self._lock:
+            old = self._index.pop(url, None)
+            if old:
+                self._total_bytes -= old.get("size", 0)
+
+            size = len(payload.encode("utf-8"))
+            self._index[url] = {
+                "etag": etag,
+                "last_modified": last_modified,
+                "content_hash": content_hash,
+                "size": size,
+            }
+            self._total_bytes += size
+            evicted = self._evict()
+
+        for evicted_url in evicted:
+            self._remove_file(evicted_url)
+
+    def refresh(self, url, etag=None, last_modified=None):
+        """Update validators after a revalidation that returned the same content."""
+        with self._lock:
+            entry = self._index.get(url)
+            if not entry:
+                return
+            if etag:
+                entry["etag"] = etag
+            if last_modified:
+                entry["last_modified"] = last_modified
+            self._index.move_to_end(url)
+
+    def _evict(self):
+        evicted = []
+        while self._total_bytes > self.max_bytes and len(self._index) > 1:
+            url, entry = self._index.popitem(last=False)
+            self._total_bytes -= entry.get("size", 0)
+            evicted.append(url)
+        return evicted
+
+    def _drop(self, url):
+        with self._lock:
+            entry = self._index.pop(url, None)
+            if entry:
+                self._total_bytes -= entry.get("size", 0)
+        self._remove_file(url)
+
+    def _remove_file(self, url):
+        try:
+            os.remove(self._entry_path(url))
+        except OSError:
+            pass
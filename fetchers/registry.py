@@ -0,0 +1,79 @@
+"""
+Registry of ingestion sources.
+
+A fetcher is registered by name as a "module:attribute" string, so its
+module (and heavy dependencies such as newsapi, bs4 or requests) is only
+imported when that source actually runs. Third-party fetchers can be
+added under the "ingestion.fetchers" entry-point group; they are listed
+by name and loaded on first use as well.
+"""
+from importlib import import_module
+from typing import Callable, Iterable, List, Optional, Protocol, Union
+
+ENTRY_POINT_GROUP = "ingestion.fetchers"
+
+Batches = Optional[Iterable[Union[List[dict], Callable[[], None]]]]
+
+
+class Fetcher(Protocol):
+    """
+    One ingestion source. collect() returns an iterable of record batches
+    (lists of dicts, optionally interleaved with checkpoint callables to run
+    once the batches before them are stored), or None when the source can't
+    run, e.g. because it is not configured.
+
+    Factories are called as factory(config, get_session) with the shared
+    CONFIG dict and a callable returning the shared requests session, and
+    the instance is kept for the life of the process.
+    """
+
+    def collect(self) -> Batches:
+        ...
+
+
+_registry = {
+    "newsapi": "fetchers.newsapi_fetcher:NewsAPIFetcher",
+    "csv": "fetchers.csv_fetcher:CSVFetcher",
+    "web": "fetchers.web_scraper:WebFetcher",
+}
+_entry_points = None
+
+
+def register_fetcher(name, factory):
+    """Register a factory, or a "module:attribute" path to one, under a source name."""
+    _registry[name] = factory
+
+
+def _discover():
+    global _entry_points
+    if _entry_points is None:
+        from importlib.metadata import entry_points
+
+        _entry_points = {
+            ep.name: ep
+            for ep in entry_points(group=ENTRY_POINT_GROUP)
+            if ep.name not in _registry
+        }
+    return _entry_points
+
+
+def fetcher_names(discover=True):
+    """Registered source names, in registration order, without importing anything."""
+    names = list(_registry)
+    if discover:
+        names.extend(name for name in _discover() if name not in _registry)
+    return names
+
+
+def load_factory(name):
+    """Resolve a source name to its factory, importing its module now."""
+    factory = _registry.get(name)
+    if factory is None:
+        entry_point = _discover().get(name)
+        if entry_point is None:
+            raise KeyError(f"Unknown source '{name}' (available: {', '.join(fetcher_names())})")
+        factory = _registry[name] = entry_point.load()
+    elif isinstance(factory, str):
+        module, _, attribute = factory.partition(":")
+        factory = _registry[name] = getattr(import_module(module), attribute)
+    return factory
@@ -1,66 +1,249 @@
+import re
 import time
+import queue
+import threading
 import requests
-from bs4 import BeautifulSoup
+from charset_normalizer import from_bytes
 from datetime import datetime
+from urllib.parse import urlsplit
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+
+from fetchers.session import build_session
+from fetchers.extractors import get_extractor
+from fetchers.page_cache import PageCache
+from pipeline.metrics import counter, histogram
+
+CHUNK_SIZE = 64 * 1024
+SNIFF_BYTES = 16 * 1024
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+
+_extractors = {}  # one instance per backend per process
+
+
+def _get_extractor(name):
+    if name not in _extractors:
+        _extractors[name] = get_extractor(name)
+    return _extractors[name]
+
+
+def detect_encoding(content_type, body):
+    """Pick a charset from the Content-Type, a <meta> tag, or a sniff of the prefix."""
+    match = re.search(r"charset=([\w.:-]+)", content_type or "", re.I)
+    if match:
+        return match.group(1)
+
+    prefix = body[:SNIFF_BYTES]
+    match = META_CHARSET.search(prefix)
+    if match:
+        return match.group(1).decode("ascii")
+
+    best = from_bytes(prefix).best()
+    return best.encoding if best else "utf-8"
+
+
+def decode_body(body, encoding):
+    try:
+        return body.decode(encoding, errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def parse_page(page):
+    """
+    Parse stage: turn a fetched page (raw bytes plus response metadata) into
+    a record. Module-level so it can run in a ProcessPoolExecutor worker.
+    """
+    body = page["body"]
+    html = decode_body(body, detect_encoding(page["content_type"], body))
+    title, content = _get_extractor(page["extractor"]).extract(html)
+
+    return {
+        "title": title,
+        "content": content or "No readable content found",
+        "source": "web scraping",
+        "url": page["url"],
+        "fetched_at": datetime.utcnow().isoformat() + "Z",
+        "status": page["status"],
+    }
+
+
+class HostThrottle:
+    """Enforces a minimum delay between requests to the same host."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
 
 class WebScraper:
-    def __init__(self, delay=1.0, timeout=10):
+    def __init__(
+        self,
+        delay=1.0,
+        timeout=10,
+        max_workers=8,
+        session=None,
+        cache=None,
+        max_bytes=2 * 1024 * 1024,
+        small_page_bytes=256 * 1024,
+        extractor="auto",
+        parse_workers=0,
+        queue_size=32,
+    ):
         """
         Initialize the scraper with technical settings only.
         URLs are provided during the run phase.
+        delay is enforced per host; max_workers caps requests in flight.
+        Pass a shared session to reuse pooled connections across runs and a
+        PageCache to revalidate pages instead of re-downloading them.
+        Bodies are cut off at max_bytes. extractor names a backend from
+        fetchers.extractors; "auto" uses the soup backend for pages up to
+        small_page_bytes and the early-stopping stream backend above that.
+        With parse_workers > 0, run_batch parses in a process pool fed by a
+        queue of at most queue_size fetched pages; otherwise parsing is inline.
         """
         self.delay = delay
         self.timeout = timeout
-        self.headers = {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/91.0.4472.124 Safari/537.36"
-            )
-        }
+        self.max_workers = max(1, max_workers)
+        self.max_bytes = max_bytes
+        self.small_page_bytes = small_page_bytes
+        self.extractor = extractor
+        if extractor != "auto":
+            get_extractor(extractor)  # fail fast on unknown backends
+        self.parse_workers = parse_workers
+        self.queue_size = max(1, queue_size)
+        self.session = session or build_session(pool_size=self.max_workers)
+        self.cache = cache
+        self.cache_stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
 
     @staticmethod
     def _timestamp():
         return datetime.utcnow().isoformat() + "Z"
 
-    def scrape_single_url(self, url):
+    def _read_body(self, response):
+        """Stream the body up to max_bytes; returns (body, truncated)."""
+        chunks = []
+        size = 0
+        truncated = False
         try:
-            response = requests.get(url, headers=self.headers, timeout=self.timeout)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_bytes:
+                    truncated = True
+                    break
+        finally:
+            response.close()
+        return b"".join(chunks)[: self.max_bytes], truncated
+
+    def _choose_extractor(self, size, truncated):
+        if self.extractor != "auto":
+            return self.extractor
+        return "stream" if truncated or size > self.small_page_bytes else "soup"
+
+    def _count_cache(self, key):
+        with self._stats_lock:
+            self.cache_stats[key] += 1
+
+    def _cached_result(self, url, response):
+        """Serve a 304 or an unchanged body from the cache, refreshing its validators."""
+        cached = self.cache.get(url)
+        if cached is None:
+            return None
+
+        self.cache.refresh(
+            url,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        self._count_cache("hits")
+        cached["fetched_at"] = self._timestamp()
+        return cached
+
+    def fetch_page(self, url):
+        """
+        Fetch stage: download url and return either a finished record (errors
+        and cache hits) or a page dict with the raw body for parse_page.
+        """
+        host = urlsplit(url).netloc
+        started = time.perf_counter()
+        page = self._fetch_page(url)
+        histogram("scrape_fetch_seconds", "Time to fetch one page", host=host).observe(
+            time.perf_counter() - started
+        )
+
+        if "error" in page:
+            outcome = "error"
+        elif "body" in page:
+            outcome = "fetched"
+            counter("scrape_bytes_total", "Body bytes downloaded", host=host).inc(len(page["body"]))
+        else:
+            outcome = "cached"
+        counter("scrape_pages_total", "Pages by outcome", host=host, outcome=outcome).inc()
+        return page
+
+    def _fetch_page(self, url):
+        try:
+            headers = self.cache.conditional_headers(url) if self.cache else None
+            response = self.session.get(
+                url, headers=headers, timeout=self.timeout, stream=True
+            )
+
+            if response.status_code == 304 and self.cache:
+                response.close()
+                cached = self._cached_result(url, response)
+                if cached is not None:
+                    return cached
+                # Validators without a usable entry: fetch unconditionally
+                response = self.session.get(url, timeout=self.timeout, stream=True)
 
             if response.status_code in (403, 404):
+                response.close()
                 return {
                     "url": url,
                     "error": f"{response.status_code} Error",
                     "status": response.status_code,
                 }
 
+            if response.status_code >= 400:
+                response.close()
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
+            body, truncated = self._read_body(response)
 
-            # Remove noise
-            for tag in soup(["script", "style", "nav", "footer", "header", "aside"]):
-                tag.decompose()
-
-            # Find a Title
-            title_tag = (
-                soup.find("h1")
-                or soup.find("title")
-                or soup.find("h2")
-            )
-            title = title_tag.get_text(strip=True) if title_tag else "No Title Found"
-
-            # Clean content
-            content = " ".join(
-                soup.get_text(separator=" ", strip=True).split()
-            )[:1000]
+            content_hash = None
+            if self.cache:
+                content_hash = self.cache.fingerprint(body)
+                if content_hash == self.cache.content_hash(url):
+                    cached = self._cached_result(url, response)
+                    if cached is not None:
+                        return cached
+                self._count_cache("misses")
 
             return {
-                "title": title,
-                "content": content or "No readable content found",
-                "source": "web scraping",
                 "url": url,
-                "fetched_at": self._timestamp(),
+                "body": body,
+                "content_type": response.headers.get("Content-Type", ""),
+                "extractor": self._choose_extractor(len(body), truncated),
                 "status": response.status_code,
+                "content_hash": content_hash,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
             }
 
         except requests.exceptions.Timeout:
@@ -70,28 +253,244 @@ class WebScraper:
         except Exception as e:
             return {"url": url, "error": str(e), "status": "unknown_error"}
 
-    def run_batch(self, urls):
-        """Accepts a list of URLs, processes them, and returns the data."""
+    def _store(self, page, result):
+        """Cache a freshly parsed page under its validators."""
+        if self.cache:
+            self.cache.put(
+                page["url"],
+                result,
+                page["content_hash"],
+                etag=page["etag"],
+                last_modified=page["last_modified"],
+            )
+        return result
+
+    def scrape_single_url(self, url):
+        page = self.fetch_page(url)
+        if "body" not in page:
+            return page
+
+        started = time.perf_counter()
+        try:
+            result = parse_page(page)
+        except Exception as e:
+            return {"url": url, "error": str(e), "status": "unknown_error"}
+        histogram(
+            "scrape_parse_seconds", "Time to extract one page", extractor=page["extractor"]
+        ).observe(time.perf_counter() - started)
+        return self._store(page, result)
+
+    def _run_inline(self, urls, throttle, report):
+        def fetch(url):
+            throttle.wait(url)
+            return self.scrape_single_url(url)
+
+        # Submitting in a window keeps finished results from piling up in
+        # futures while the consumer catches up
+        workers = min(self.max_workers, len(urls))
+        queued = iter(enumerate(urls))
+        futures = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while True:
+                for i, url in queued:
+                    futures[pool.submit(fetch, url)] = i
+                    if len(futures) >= workers * 2:
+                        break
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report(futures.pop(future), future.result())
+
+    def _run_pipelined(self, urls, throttle, report):
+        """
+        Fetch threads push raw pages into a bounded queue; this thread hands
+        them to a process pool for parsing. A full queue blocks the fetchers,
+        and at most two pages per parse worker are in flight at once.
+
+        If the pool breaks (a worker died), fetching stops and every URL
+        not processed yet is reported as an error record.
+        """
+        pages = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def fetch(i, url):
+            if stop.is_set():
+                return
+            throttle.wait(url)
+            page = self.fetch_page(url)
+            while not stop.is_set():
+                try:
+                    pages.put((i, page), timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def parsed(page, future):
+            try:
+                return self._store(page, future.result())
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                return {"url": page["url"], "error": str(e), "status": "unknown_error"}
+
+        max_in_flight = self.parse_workers * 2
+        received = 0
+        parsing = {}
+        done = set()
+        broken = None
+
+        workers = min(self.max_workers, len(urls))
+        with ThreadPoolExecutor(max_workers=workers) as fetchers, ProcessPoolExecutor(
+            max_workers=self.parse_workers
+        ) as parsers:
+            for i, url in enumerate(urls):
+                fetchers.submit(fetch, i, url)
+
+            try:
+                while received < len(urls) or parsing:
+                    can_take = received < len(urls) and len(parsing) < max_in_flight
+                    if can_take:
+                        try:
+                            i, page = pages.get(timeout=0.05)
+                        except queue.Empty:
+                            pass
+                        else:
+                            received += 1
+                            if "body" in page:
+                                parsing[parsers.submit(parse_page, page)] = (i, page)
+                            else:
+                                done.add(i)
+                                report(i, page)
+
+                    if not parsing:
+                        continue
+                    finished, _ = wait(
+                        parsing,
+                        timeout=0 if can_take else None,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        i, page = parsing[future]
+                        result = parsed(page, future)
+                        del parsing[future]
+                        done.add(i)
+                        report(i, result)
+            except BrokenProcessPool as e:
+                broken = e
+                stop.set()
+                fetchers.shutdown(wait=False, cancel_futures=True)
+
+        if broken is not None:
+            print(f"⚠ Parse workers failed ({broken}); {len(urls) - len(done)} URLs not processed")
+            for i, url in enumerate(urls):
+                if i not in done:
+                    report(i, {
+                        "url": url,
+                        "error": f"parse worker pool failed: {broken}",
+                        "status": "unknown_error",
+                    })
+
+    def iter_batch(self, urls):
+        """
+        Yield (index, record) for each URL as soon as it is done, in
+        completion order. Scraping runs on a background thread and blocks
+        when the consumer falls more than queue_size results behind.
+        """
         if not urls:
             print("No URLs provided to run_batch")
-            return []
+            return
 
-        results = []
+        self.cache_stats = {"hits": 0, "misses": 0}
+        throttle = HostThrottle(self.delay)
+        finished = queue.Queue(maxsize=self.queue_size)
         print(f"Scraping {len(urls)} URLs...\n")
 
-        for i, url in enumerate(urls, 1):
-            print(f"[{i}/{len(urls)}] {url}")
-            result = self.scrape_single_url(url)
-            results.append(result)
-
+        def report(i, result):
+            reported[0] += 1
+            print(f"[{reported[0]}/{len(urls)}] {urls[i]}")
             if "error" in result:
                 print(f"  ✗ {result['error']}")
             else:
                 print(f"  ✓ {result['title'][:50]}")
+            finished.put((i, result))
+
+        def work():
+            try:
+                if self.parse_workers > 0:
+                    self._run_pipelined(urls, throttle, report)
+                else:
+                    self._run_inline(urls, throttle, report)
+            finally:
+                finished.put(None)
 
-            if i < len(urls):
-                time.sleep(self.delay)
+        reported = [0]
+        worker = threading.Thread(target=work, name="scraper", daemon=True)
+        worker.start()
 
-        success = sum(1 for r in results if "error" not in r)
-        print(f"\nCompleted: {success} success, {len(results) - success} failed\n")
-        return results
\ No newline at end of file
+        success = failed = 0
+        while True:
+            item = finished.get()
+            if item is None:
+                break
+            if "error" in item[1]:
+                failed += 1
+            else:
+                success += 1
+            yield item
+        worker.join()
+
+        print(f"\nCompleted: {success} success, {failed} failed")
+        if self.cache:
+            self.cache.save()
+            print(
+                f"Cache: {self.cache_stats['hits']} hits, "
+                f"{self.cache_stats['misses']} misses"
+            )
+        print()
+
+    def run_batch(self, urls):
+        """Accepts a list of URLs, processes them, and returns the data."""
+        results = [None] * len(urls)
+        for i, result in self.iter_batch(urls):
+            results[i] = result
+        return results
+
+
+class WebFetcher:
+    """Registry entry for web scraping; the scraper and its page cache live across runs."""
+
+    def __init__(self, config, get_session):
+        self.config = config
+        self.get_session = get_session
+        self.scraper = None
+
+    def collect(self):
+        if not self.config["urls"]:
+            print("✗ No websites configured")
+            return None
+
+        if self.scraper is None:
+            workers = self.config["scrape_workers"]
+            queue_size = 32
+            small_page_bytes = 256 * 1024
+            budget_mb = self.config.get("memory_budget_mb")
+            if budget_mb:
+                # Keep queued bodies (up to 2 MB each) and soup trees (about
+                # 30x the page, freed only by the cyclic GC) to a quarter of
+                # the budget each; larger pages use the streaming extractor
+                quarter = budget_mb * 1024 * 1024 / 4
+                queue_size = max(1, min(queue_size, int(quarter // (2 * 1024 * 1024))))
+                small_page_bytes = min(small_page_bytes, int(quarter // (30 * max(1, workers))))
+            self.scraper = WebScraper(
+                delay=self.config.get("scrape_delay", 1.0),
+                max_workers=workers,
+                session=self.get_session(),
+                parse_workers=self.config["parse_workers"],
+                queue_size=queue_size,
+                small_page_bytes=small_page_bytes,
+                cache=PageCache(
+                    self.config["cache_dir"], max_bytes=self.config["cache_max_bytes"]
+                ),
+            )
+        return ([record] for _, record in self.scraper.iter_batch(self.config["urls"]))
@@ -1,13 +1,27 @@
 import os
+import sys
 import time
-import json
+import signal
 import logging
+import argparse
+import threading
+from functools import partial
 from datetime import datetime
-from logging.handlers import RotatingFileHandler
 
-from fetchers.newsapi_fetcher import NewsAPIHandler
-from fetchers.web_scraper import WebScraper
-from fetchers.csv_reader import CSVToJSON
+from fetchers.csv_manifest import CSVManifest
+from fetchers.registry import fetcher_names, load_factory
+from storage.jsonl_store import JSONLStore
+from storage.sqlite_store import SQLiteStore
+from storage.segmented_store import SegmentedStore
+from storage.dedup import DedupIndex, record_id
+from storage.stats import StoreStats
+from storage.search import InvertedIndex
+from storage.neardup import NearDupIndex
+from pipeline.memory import MemoryBudget, budget_batch_size, estimate_bytes
+from pipeline.orchestrator import PipelineMetrics, run_concurrently
+from pipeline.scheduler import Scheduler
+from pipeline.metrics import REGISTRY, append_ledger, counter, diff, histogram
+from pipeline.profiling import Profiler
 
 # =========================
 # Configuration
@@ -21,8 +35,47 @@ CONFIG = {
         "https://news.ycombinator.com",
         "https://themeisle.com/blog/rss-feeds-list/#gref"
     ],
-    "save_path": f"{OUTPUT_DIR}/scraped_data.json",
+    "save_path": f"{OUTPUT_DIR}/scraped_data.jsonl",
+    "legacy_save_path": f"{OUTPUT_DIR}/scraped_data.json",
+    "dedup_index_path": f"{OUTPUT_DIR}/dedup_index.txt",
+    "stats_path": f"{OUTPUT_DIR}/store_stats.json",
+    "search_index_dir": f"{OUTPUT_DIR}/search_index",
+    "near_dup_mode": "link",  # "link" (keep with _duplicate_of), "drop" or None to disable
+    "near_dup_threshold": 0.8,  # estimated Jaccard similarity of word 3-grams
+    "near_dup_index_path": f"{OUTPUT_DIR}/near_dup_index.tsv",
+    "store_backend": "jsonl",  # "jsonl", "sqlite" or "segmented"
+    "sqlite_path": f"{OUTPUT_DIR}/ingestion.db",
+    "segment_root": f"{OUTPUT_DIR}/segments",
+    "segment_codec": "gzip",  # codec for compacted segments: "gzip" or "lzma"
+    "retention_days": None,  # segmented store: drop partitions older than this
+    "export_path": f"{OUTPUT_DIR}/scraped_data_export.json",
     "csv_dir": f"{BASE_DIR}/csv_data",
+    "csv_batch_size": 1000,
+    "csv_workers": 0,  # >0 parses files (and chunks of large files) in a process pool
+    "csv_chunk_bytes": 32 * 1024 * 1024,
+    "csv_incremental": True,  # skip unchanged files, resume grown ones
+    "csv_settle_seconds": 60,  # an unterminated last row is left for later until the file is this old
+    "csv_manifest_path": f"{OUTPUT_DIR}/csv_manifest.json",
+    "queue_size": 8,  # batches buffered between fetchers and the writer
+    "commit_size": 500,  # records per group commit...
+    "commit_interval": 2.0,  # ...or seconds the oldest pending record may wait
+    "memory_budget_mb": None,  # cap on records in flight; smaller batches, spills past it
+    "spill_dir": f"{OUTPUT_DIR}/spill",
+    "scrape_workers": 8,
+    "scrape_delay": 1.0,  # seconds between requests to the same host
+    "parse_workers": 0,  # >0 parses pages in a process pool
+    "http_pool_size": 10,
+    "http_retries": 2,
+    "cache_dir": f"{OUTPUT_DIR}/page_cache",
+    "cache_max_bytes": 50 * 1024 * 1024,
+    "schedule": {"newsapi": 3600, "csv": 300, "web": 900},  # seconds between runs
+    "schedule_jitter": 0.1,  # +/- fraction of each interval
+    "metrics_path": f"{OUTPUT_DIR}/metrics.prom",  # Prometheus text, rewritten after each run
+    "metrics_ledger_path": f"{OUTPUT_DIR}/metrics_ledger.jsonl",  # one line per run
+    "profile_enabled": False,  # cProfile + tracemalloc around handlers and fetcher stages
+    "profile_every": 1,  # profile every Nth run of each handler/stage
+    "profile_top": 30,  # functions and allocation sites per report
+    "profile_dir": f"{OUTPUT_DIR}/profiles",
     "log_path": f"{LOG_DIR}/ingestion_logs.log"
 }
 
@@ -30,6 +83,8 @@ CONFIG = {
 # Logging
 # =========================
 def setup_logger():
+    from logging.handlers import RotatingFileHandler
+
     os.makedirs(OUTPUT_DIR, exist_ok=True)
     logger = logging.getLogger("ingestion")
     logger.setLevel(logging.INFO)
@@ -52,10 +107,17 @@ def setup_logger():
     logger.addHandler(console_handler)
     return logger
 
-logger = setup_logger()
+_logger = None
+
+def get_logger():
+    """Set up file logging on first use rather than at import."""
+    global _logger
+    if _logger is None:
+        _logger = setup_logger()
+    return _logger
 
 def log(level, msg, src="system"):
-    getattr(logger, level)(f"[{src}] {msg}")
+    getattr(get_logger(), level)(f"[{src}] {msg}")
 
 # =========================
 # Utilities
@@ -63,81 +125,262 @@ def log(level, msg, src="system"):
 def clear():
     os.system("cls" if os.name == "nt" else "clear")
 
+def open_store():
+    jsonl = JSONLStore(CONFIG["save_path"], legacy_path=CONFIG["legacy_save_path"])
+    backend = CONFIG["store_backend"]
+    if backend == "sqlite":
+        target = SQLiteStore(CONFIG["sqlite_path"])
+    elif backend == "segmented":
+        target = SegmentedStore(CONFIG["segment_root"], codec=CONFIG["segment_codec"])
+    else:
+        return jsonl
+
+    if next(target.iter_records(), None) is None and os.path.exists(CONFIG["save_path"]):
+        # First switch away from JSONL: bring the history along, once. The
+        # file is set aside so an emptied store (Clear Data) stays empty.
+        imported = target.append(jsonl.iter_records())
+        os.replace(CONFIG["save_path"], CONFIG["save_path"] + ".imported")
+        log("info", f"Imported {imported} records into the {backend} store")
+    return target
+
+store = None
+
+def get_store():
+    """Open the configured store on first use rather than at import."""
+    global store
+    if store is None:
+        store = open_store()
+    return store
+
+def maintain_store():
+    """Kick off background upkeep for stores that need it."""
+    current = get_store()
+    if isinstance(current, SegmentedStore):
+        current.compact_in_background(CONFIG["retention_days"])
+
+def finish_maintenance():
+    """Let background upkeep finish; the compactor is a daemon thread that exit would cut off."""
+    if isinstance(store, SegmentedStore):  # only if opened: nothing to wait for otherwise
+        store.wait_for_compaction()
+
+dedup = DedupIndex(CONFIG["dedup_index_path"])
+stats = StoreStats(CONFIG["stats_path"])
+search_index = InvertedIndex(CONFIG["search_index_dir"])
+near_dups = NearDupIndex(CONFIG["near_dup_index_path"], threshold=CONFIG["near_dup_threshold"])
+
 def load_json():
-    if not os.path.exists(CONFIG["save_path"]):
-        return []
+    """Stream stored records; nothing is held in memory beyond the current one."""
     try:
-        with open(CONFIG["save_path"]) as f:
-            return json.load(f)
+        yield from get_store().iter_records()
     except Exception as e:
         log("error", f"Failed loading JSON: {e}")
-        return []
 
 def save_json(data):
-    with open(CONFIG["save_path"], "w") as f:
-        json.dump(data, f, indent=2)
+    get_store().replace(data)
+
+# Scheduled sources run on their own threads; writes still happen one at a time
+write_lock = threading.Lock()
+
+def open_run(source):
+    """State for one ingestion run of a source; every batch shares its timestamp."""
+    return {
+        "source": source,
+        "started": time.monotonic(),
+        "timestamp": datetime.utcnow().isoformat(),
+        "written": 0,
+        "duplicates": 0,
+        "near": 0,
+    }
+
+def write_batch(run, batch):
+    """Stamp, dedup and store one batch of a run."""
+    with write_lock:
+        if callable(batch):
+            batch()  # checkpoint: every batch before it has been stored
+            return
+        if not batch:
+            return
+        source = run["source"]
+        for item in batch:
+            item.update({
+                "_timestamp": run["timestamp"],
+                "_source": source,
+                "_id": record_id(item, source)
+            })
+
+        new, skipped = dedup.filter_new(batch)
+        run["duplicates"] += skipped
+        counter("records_duplicate_total", "Exact duplicates skipped", source=source).inc(skipped)
+        if new and CONFIG["near_dup_mode"]:
+            new, found = near_dups.filter(new, CONFIG["near_dup_mode"])
+            run["near"] += found
+            counter("records_near_duplicate_total", "Near-duplicates found", source=source).inc(found)
+        if new:
+            with histogram("store_append_seconds", "Time to append one batch", source=source).time():
+                written = get_store().append(new)
+            run["written"] += written
+            counter("records_written_total", "Records stored", source=source).inc(written)
+            dedup.add(item["_id"] for item in new)
+            if CONFIG["near_dup_mode"]:
+                near_dups.add(item["_id"] for item in new)
+            stats.add_records(new)
+            search_index.add(new)
+
+def close_run(run):
+    with write_lock:
+        source, written, duplicates, near = run["source"], run["written"], run["duplicates"], run["near"]
+        if not written and not duplicates and not near:
+            log("warning", "No data to append", source)
+            return False
+
+        dropped = near if CONFIG["near_dup_mode"] == "drop" else 0
+        duration = time.monotonic() - run["started"]
+        histogram("ingest_run_seconds", "Duration of one source run", source=source).observe(duration)
+        stats.finish_run(source, get_store(), duration, written, duplicates + dropped)
+
+        maintain_store()
+        near_note = f", {near} near-duplicates {'dropped' if dropped else 'linked'}" if near else ""
+        log("info", f"Added {written} items, skipped {duplicates} duplicates{near_note}", source)
+        print(f"✓ {source}: {written} items added ({duplicates} duplicates skipped{near_note})")
+        return True
+
+def append_batches(batches, source):
+    """Stamp and store each batch as it arrives; only one batch is held at a time."""
+    run = open_run(source)
+    for batch in batches:
+        write_batch(run, batch)
+    return close_run(run)
 
 def append_data(new_data, source):
-    if not new_data:
-        log("warning", "No data to append", source)
-        return False
-
-    timestamp = datetime.utcnow().isoformat()
-    for item in new_data:
-        item.update({
-            "_timestamp": timestamp,
-            "_source": source,
-            "_id": f"{source}_{int(time.time())}_{abs(hash(str(item)))}"
-        })
-
-    data = load_json()
-    data.extend(new_data)
-    save_json(data)
+    if not new_data or not CONFIG["memory_budget_mb"]:
+        return append_batches([new_data] if new_data else [], source)
+    # Stamping, dedup and indexing work on one budget-sized slice at a time
+    record_bytes = max(1, estimate_bytes(new_data) // len(new_data))
+    size = budget_batch_size(len(new_data), CONFIG["memory_budget_mb"], record_bytes)
+    return append_batches(
+        (new_data[i:i + size] for i in range(0, len(new_data), size)), source
+    )
 
-    log("info", f"Added {len(new_data)} items (total {len(data)})", source)
-    print(f"✓ {source}: {len(new_data)} items added")
-    return True
+# =========================
+# Shared clients and fetchers
+# =========================
+# Kept for the lifetime of the process so repeated runs reuse open
+# connections and caches instead of paying a new TCP+TLS handshake each time.
+# Fetcher modules are imported the first time their source runs.
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_session():
+    with _clients_lock:
+        if "session" not in _clients:
+            from fetchers.session import build_session
+
+            _clients["session"] = build_session(
+                pool_size=CONFIG["http_pool_size"], retries=CONFIG["http_retries"]
+            )
+        return _clients["session"]
+
+def get_fetcher(source):
+    key = f"fetcher:{source}"
+    with _clients_lock:
+        if key not in _clients:
+            _clients[key] = load_factory(source)(CONFIG, get_session)
+        return _clients[key]
+
+def get_memory_budget():
+    if not CONFIG["memory_budget_mb"]:
+        return None
+    with _clients_lock:
+        if "memory_budget" not in _clients:
+            _clients["memory_budget"] = MemoryBudget(CONFIG["memory_budget_mb"], CONFIG["spill_dir"])
+        return _clients["memory_budget"]
+
+def get_profiler():
+    with _clients_lock:
+        if "profiler" not in _clients:
+            _clients["profiler"] = Profiler(
+                CONFIG["profile_dir"],
+                every=CONFIG["profile_every"],
+                top=CONFIG["profile_top"],
+                enabled=CONFIG["profile_enabled"],
+            )
+        return _clients["profiler"]
+
+def collect(source):
+    """Runs on the source's producer thread, which is profiled separately."""
+    session = get_profiler().begin(f"fetch-{source}")
+    if session is None:
+        return get_fetcher(source).collect()
+    try:
+        batches = get_fetcher(source).collect()
+    except Exception:
+        session.end()
+        raise
+    if batches is None:
+        session.end()
+        return None
+
+    def profiled():
+        try:
+            yield from batches
+        finally:
+            session.end()
+
+    return profiled()
 
 # =========================
 # Ingestion Handlers
 # =========================
+def run_pipeline(sources, metrics=None):
+    """Stream the given sources through the bounded queue into the single writer."""
+    before = REGISTRY.snapshot()
+    started = time.monotonic()
+    budget = get_memory_budget()
+    report = run_concurrently(
+        {source: partial(collect, source) for source in sources},
+        open_run,
+        write_batch,
+        close_run,
+        queue_size=CONFIG["queue_size"],
+        commit_size=budget.batch_size(CONFIG["commit_size"]) if budget else CONFIG["commit_size"],
+        commit_interval=CONFIG["commit_interval"],
+        metrics=metrics,
+        budget=budget,
+    )
+    record_metrics(report, before, time.monotonic() - started)
+    return report
+
+def record_metrics(report, before, duration):
+    """Rewrite the Prometheus file and add this run's deltas to the ledger."""
+    try:
+        REGISTRY.write(CONFIG["metrics_path"])
+        append_ledger(CONFIG["metrics_ledger_path"], {
+            "at": datetime.utcnow().isoformat(),
+            "duration": round(duration, 3),
+            "sources": {source: entry["status"] for source, entry in report.items()},
+            "metrics": diff(before, REGISTRY.snapshot()),
+        })
+    except OSError as e:
+        log("error", f"Failed writing metrics: {e}")
+
+def ingest(source):
+    entry = run_pipeline([source])[source]
+    if entry["error"]:
+        log("error", entry["error"], source)
+        print(f"✗ {entry['error']}")
+    return bool(entry["result"])
+
 def fetch_newsapi():
     clear()
-    api_key = os.getenv("NEWS_API_KEY")
-    if not api_key:
-        print("✗ NEWS_API_KEY not set")
-        return False
-
-    handler = NewsAPIHandler(api_key)
-    data = handler.fetch_newsapi_sources()
-    return append_data(data or [], "newsapi")
+    return ingest("newsapi")
 
 def scrape_web():
     clear()
-    if not CONFIG["urls"]:
-        print("✗ No websites configured")
-        return False
-
-    scraper = WebScraper(delay=1)
-    data = scraper.run_batch(CONFIG["urls"])
-    return append_data(data if isinstance(data, list) else [data], "web")
+    return ingest("web")
 
 def read_csv():
     clear()
-    if not os.path.isdir(CONFIG["csv_dir"]):
-        print("✗ CSV directory not found")
-        return False
-
-    all_rows = []
-    for file in os.listdir(CONFIG["csv_dir"]):
-        if file.endswith(".csv"):
-            path = os.path.join(CONFIG["csv_dir"], file)
-            rows = CSVToJSON(path).convert() or []
-            for r in rows:
-                r["csv_file"] = file
-            all_rows.extend(rows)
-
-    return append_data(all_rows, "csv")
+    return ingest("csv")
 
 # =========================
 # Dynamic Website Input
@@ -172,43 +415,142 @@ def add_websites():
 # =========================
 def view_data():
     clear()
-    data = load_json()
-    if not data:
+    show_stats()
+
+def show_stats():
+    if not stats.exists():
+        stats.rebuild(get_store())  # first view after upgrading: build the sidecar once
+    elif stats.is_stale(get_store()):
+        print("⚠ Store changed outside ingestion runs; choose Rebuild Stats to refresh\n")
+
+    summary = stats.load()
+    if not summary["total"]:
         print("No data available")
         return
 
-    print(f"Total items: {len(data)}\n")
-    sources = {}
-    for i in data:
-        sources[i["_source"]] = sources.get(i["_source"], 0) + 1
-
-    for s, c in sources.items():
-        print(f"{s}: {c}")
+    print(f"Total items: {summary['total']} ({summary['bytes'] / 1024:.1f} KB)")
+    print(f"From {summary['first_timestamp']} to {summary['last_timestamp']}\n")
+    for s, info in summary["sources"].items():
+        print(f"{s}: {info['count']} ({info['bytes'] / 1024:.1f} KB)")
+        print(f"  {info['first_timestamp']} → {info['last_timestamp']}")
+        run = info.get("last_run")
+        if run:
+            print(
+                f"  last run {run['at']}: {run['added']} added, "
+                f"{run['duplicates']} duplicates, {run['duration']:.2f}s"
+            )
+
+def rebuild_stats():
+    clear()
+    problems = stats.verify(get_store())
+    for problem in problems:
+        print(f"⚠ {problem}")
+    stats.rebuild(get_store())
+    log("info", f"Rebuilt store stats ({len(problems)} differences)")
+    print(f"✓ Stats rebuilt ({len(problems)} differences fixed)")
+
+def search_data():
+    clear()
+    query = input("Search: ").strip()
+    if not query:
+        print("No query entered")
+        return
+    source = input("Source (blank for all): ").strip() or None
+    since = input("From date YYYY-MM-DD (blank for any): ").strip() or None
+    until = input("Before date YYYY-MM-DD (blank for any): ").strip() or None
+    show_search(query, source, since, until)
+
+def show_search(query, source=None, since=None, until=None, limit=10):
+    if not len(search_index) and next(get_store().iter_records(), None) is not None:
+        print("Building search index...")
+        indexed = search_index.rebuild(get_store().iter_records())
+        log("info", f"Built search index over {indexed} records")
+
+    started = time.perf_counter()
+    results = search_index.search(query, source=source, since=since, until=until, limit=limit)
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if not results:
+        print(f"\nNo matches ({elapsed:.1f} ms)")
+        return
+    print(f"\n{len(results)} results ({elapsed:.1f} ms)\n")
+    for i, r in enumerate(results, 1):
+        print(f"{i}. [{r['_source']}] {r['title'] or r['_id']}  ({r['score']})")
+        if r.get("url"):
+            print(f"   {r['url']}")
+        print(f"   {r['_timestamp']}")
+
+def export_data():
+    """Write the store out in the original JSON array format."""
+    count = get_store().export_json(CONFIG["export_path"])
+    log("info", f"Exported {count} records to {CONFIG['export_path']}")
+    print(f"✓ Exported {count} records to {CONFIG['export_path']}")
+    return count
 
 def clear_data():
     clear()
     confirm = input("Clear ALL data? (y/n): ").lower()
     if confirm == "y":
-        save_json([])
+        get_store().clear()
+        dedup.clear()
+        stats.reset(get_store())
+        search_index.clear()
+        near_dups.clear()
+        # Cleared rows should be picked up again on the next CSV run
+        CSVManifest(CONFIG["csv_manifest_path"]).clear()
         print("✓ Data cleared")
 
 def view_logs():
     clear()
+    tail_logs()
+
+def tail_logs(lines=20):
     if not os.path.exists(CONFIG["log_path"]):
         print("No logs found")
         return
 
     with open(CONFIG["log_path"]) as f:
-        lines = f.readlines()[-20:]
-    print("".join(lines))
+        tail = f.readlines()[-lines:]
+    print("".join(tail))
 
 # =========================
 # Runner
 # =========================
 def run_all():
-    for fn in (fetch_newsapi, read_csv, scrape_web):
-        fn()
-        time.sleep(1)
+    """Run every source at once; batches are written by this thread only."""
+    clear()
+    return run_sources(fetcher_names())
+
+def run_sources(sources):
+    started = time.monotonic()
+    metrics = PipelineMetrics()
+    report = run_pipeline(sources, metrics)
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'source':<10} {'status':<8} {'added':>7} {'dupes':>7} {'time':>8}")
+    for source, entry in report.items():
+        run = entry["run"] or {}
+        duration = f"{entry['duration']:.2f}s" if entry["duration"] is not None else "-"
+        print(
+            f"{source:<10} {entry['status']:<8} {run.get('written', 0):>7} "
+            f"{run.get('duplicates', 0):>7} {duration:>8}"
+        )
+        if entry["error"]:
+            log("error", f"Run failed: {entry['error']}", source)
+            print(f"  ✗ {entry['error']}")
+    pipeline = metrics.snapshot()
+    print(f"\nTotal: {elapsed:.2f}s")
+    print(
+        f"Commits: {pipeline['commits']} ({pipeline['committed_records']} records), "
+        f"latency p50 {pipeline['commit_p50_ms']} ms / p95 {pipeline['commit_p95_ms']} ms"
+    )
+    print(
+        f"Queue depth: max {pipeline['max_queue_depth']}, "
+        f"mean {pipeline['mean_queue_depth']:.1f}; "
+        f"producers blocked {pipeline['producer_blocked_seconds']}s"
+    )
+    log("info", f"Ran {', '.join(report)} in {elapsed:.2f}s: {pipeline}")
+    return report
 
 # =========================
 # Menu
@@ -222,7 +564,9 @@ MENU = {
     "6": ("Clear Data", clear_data),
     "7": ("View Logs", view_logs),
     "8": ("Add Websites to Scrape", add_websites),
-    "9": ("Exit", None)
+    "9": ("Exit", None),
+    "10": ("Rebuild Stats", rebuild_stats),
+    "11": ("Search", search_data),
 }
 
 def menu():
@@ -237,14 +581,101 @@ def menu():
             break
         action = MENU.get(choice)
         if action:
-            action[1]()
+            get_profiler().call(action[1].__name__, action[1])
         else:
             print("Invalid choice")
         input("\nPress Enter...")
 
+# =========================
+# Headless CLI
+# =========================
+def run_scheduler():
+    """Run each configured source on its interval until SIGINT/SIGTERM."""
+    def run(source):
+        return get_profiler().call(f"schedule-{source}", ingest, source)
+
+    scheduler = Scheduler(
+        CONFIG["schedule"],
+        run,
+        jitter=CONFIG["schedule_jitter"],
+    )
+
+    def stop(signum, frame):
+        log("info", f"Received signal {signum}, stopping after running jobs finish", "scheduler")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    scheduler.run_forever()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Multi-source ingestion. Without a command the interactive menu starts."
+    )
+    parser.add_argument(
+        "--profile", type=int, nargs="?", const=1, metavar="N",
+        help=f"profile every Nth run (default 1) into {CONFIG['profile_dir']}",
+    )
+    commands = parser.add_subparsers(dest="command")
+
+    ingest_cmd = commands.add_parser("ingest", help="ingest the given sources (default: all) concurrently")
+    ingest_cmd.add_argument("sources", nargs="*", metavar="source", help="default: every registered source")
+
+    commands.add_parser("stats", help="show store statistics")
+
+    logs_cmd = commands.add_parser("logs", help="print the end of the log file")
+    logs_cmd.add_argument("-n", "--lines", type=int, default=20)
+
+    search_cmd = commands.add_parser("search", help="ranked keyword search")
+    search_cmd.add_argument("query")
+    search_cmd.add_argument("--source")
+    search_cmd.add_argument("--since", help="YYYY-MM-DD")
+    search_cmd.add_argument("--until", help="YYYY-MM-DD, exclusive")
+    search_cmd.add_argument("--limit", type=int, default=10)
+
+    commands.add_parser("export", help="write the store out as a JSON array")
+
+    commands.add_parser("schedule", help="run every source on its interval until stopped")
+    return parser
+
+def cli(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.profile is not None:
+        CONFIG["profile_enabled"] = True
+        CONFIG["profile_every"] = args.profile
+    try:
+        if args.command is None:
+            menu()
+            return 0
+        return get_profiler().call(f"cli-{args.command}", run_command, parser, args)
+    finally:
+        finish_maintenance()
+
+def run_command(parser, args):
+    if args.command == "ingest":
+        names = fetcher_names()
+        unknown = [s for s in args.sources if s not in names]
+        if unknown:
+            parser.error(f"unknown source(s): {', '.join(unknown)} (choose from {', '.join(names)})")
+        report = run_sources(args.sources or names)
+        return 1 if any(e["status"] == "failed" for e in report.values()) else 0
+    if args.command == "stats":
+        show_stats()
+    elif args.command == "logs":
+        tail_logs(args.lines)
+    elif args.command == "search":
+        show_search(args.query, args.source, args.since, args.until, args.limit)
+    elif args.command == "export":
+        export_data()
+    elif args.command == "schedule":
+        return run_scheduler()
+    return 0
+
 # =========================
 # Entry
 # =========================
 if __name__ == "__main__":
     log("info", "System started")
-    menu()
+    sys.exit(cli(sys.argv[1:]))
@@ -0,0 +1,132 @@
+"""
+Memory budget for ingestion runs.
+
+The budget bounds the records in flight between fetchers and the writer
+(queued batches plus records waiting for a group commit):
+
+    budget = MemoryBudget(64, "output/spill")
+    if budget.reserve(nbytes):
+        ...  # keep the batch in memory, release(nbytes) once written
+    else:
+        spilled = budget.spill(batch)  # JSONL on disk until the writer wants it
+
+Sizes are estimates (sys.getsizeof of a sample of records), and the
+budget does not cover the dedup, near-duplicate and search indexes, which
+grow with the store. batch_size() turns a budget into smaller batches for
+the fetchers, so a single batch can never take a large share of it.
+"""
+import os
+import sys
+import glob
+import json
+import tempfile
+import threading
+
+from pipeline.metrics import counter, gauge
+
+SAMPLE_RECORDS = 16
+DEFAULT_RECORD_BYTES = 4096  # assumed size of a record before any were seen
+BATCH_SHARE = 0.05  # largest fraction of the budget one batch may take
+COMMIT_SHARE = 0.25  # pending records per source before a commit is forced
+
+
+def estimate_bytes(records):
+    """Approximate in-memory size of a list of flat dict records."""
+    if not records:
+        return 0
+    step = max(1, len(records) // SAMPLE_RECORDS)
+    sample = records[::step][:SAMPLE_RECORDS]
+    total = 0
+    for record in sample:
+        total += sys.getsizeof(record)
+        for key, value in record.items():
+            total += sys.getsizeof(key) + sys.getsizeof(value)
+    return sys.getsizeof(records) + total * len(records) // len(sample)
+
+
+def budget_batch_size(default, budget_mb, record_bytes=DEFAULT_RECORD_BYTES):
+    """default, shrunk so one batch stays under BATCH_SHARE of budget_mb."""
+    if not budget_mb:
+        return default
+    fitting = int(budget_mb * 1024 * 1024 * BATCH_SHARE // record_bytes)
+    return max(1, min(default, fitting))
+
+
+class SpilledBatch:
+    """A batch written to a JSONL file; read back in chunks, then deleted."""
+
+    def __init__(self, path, count):
+        self.path = path
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def chunks(self, size):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                chunk = []
+                for line in f:
+                    chunk.append(json.loads(line))
+                    if len(chunk) >= size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+        finally:
+            self.discard()
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class MemoryBudget:
+    def __init__(self, limit_mb, spill_dir):
+        self.limit = int(limit_mb * 1024 * 1024)
+        self.spill_dir = spill_dir
+        self.used = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self._gauge = gauge("memory_budget_used_bytes", "Estimated bytes of records in flight")
+        gauge("memory_budget_limit_bytes", "Configured memory budget").set(self.limit)
+        # Spill files only live for one run; anything left is from a crash
+        for path in glob.glob(os.path.join(spill_dir, "spill-*.jsonl")):
+            os.remove(path)
+
+    @property
+    def commit_bytes(self):
+        return int(self.limit * COMMIT_SHARE)
+
+    def batch_size(self, default, record_bytes=DEFAULT_RECORD_BYTES):
+        return budget_batch_size(default, self.limit / 1024 / 1024, record_bytes)
+
+    def reserve(self, nbytes):
+        """Account for nbytes if they fit; a lone batch always fits an idle budget."""
+        with self._lock:
+            if self.used and self.used + nbytes > self.limit:
+                return False
+            self.used += nbytes
+            self.peak = max(self.peak, self.used)
+            used = self.used
+        self._gauge.set(used)
+        return True
+
+    def release(self, nbytes):
+        with self._lock:
+            self.used = max(0, self.used - nbytes)
+            used = self.used
+        self._gauge.set(used)
+
+    def spill(self, records):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix="spill-", suffix=".jsonl", dir=self.spill_dir)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            size = f.tell()
+        counter("memory_spilled_batches_total", "Batches spilled to disk").inc()
+        counter("memory_spilled_bytes_total", "Bytes written to spill files").inc(size)
+        return SpilledBatch(path, len(records))
@@ -0,0 +1,226 @@
+"""
+In-process metrics: counters, gauges and fixed-bucket histograms.
+
+Series are created on first use and keyed by name plus labels:
+
+    histogram("scrape_seconds", host="example.com").observe(0.42)
+    counter("csv_rows_total", file="a.csv").inc(1000)
+
+REGISTRY.render() gives the Prometheus text exposition format and
+REGISTRY.snapshot() a plain dict, which diff() turns into per-run deltas.
+"""
+import os
+import json
+import time
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Seconds; suits HTTP requests and file reads alike
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def sample(self):
+        return self.value
+
+
+class Gauge:
+    kind = "gauge"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0
+
+    def set(self, value):
+        with self._lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def sample(self):
+        return self.value
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)  # non-cumulative, one per upper bound
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self.count += 1
+            self.sum += value
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+                    break
+
+    @contextmanager
+    def time(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+    def sample(self):
+        with self._lock:
+            return {"count": self.count, "sum": self.sum, "buckets": list(self.counts)}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # (name, labels) -> metric
+        self._help = {}
+
+    def _get(self, cls, name, help, labels, **kwargs):
+        key = (name, tuple(sorted(labels.items())))
+        metric = self._series.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._series.get(key)
+                if metric is None:
+                    metric = self._series[key] = cls(**kwargs)
+                    if help:
+                        self._help.setdefault(name, help)
+        if metric.kind != cls.kind:
+            raise ValueError(f"Metric '{name}' is a {metric.kind}, not a {cls.kind}")
+        return metric
+
+    def counter(self, name, help="", **labels):
+        return self._get(Counter, name, help, labels)
+
+    def gauge(self, name, help="", **labels):
+        return self._get(Gauge, name, help, labels)
+
+    def histogram(self, name, help="", buckets=DEFAULT_BUCKETS, **labels):
+        return self._get(Histogram, name, help, labels, buckets=buckets)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._help.clear()
+
+    def snapshot(self):
+        """{kind: {"name{labels}": value or histogram dict}} for every series."""
+        with self._lock:
+            series = list(self._series.items())
+        samples = {"counter": {}, "gauge": {}, "histogram": {}}
+        for (name, labels), metric in series:
+            samples[metric.kind][f"{name}{_labels(labels)}"] = metric.sample()
+        return samples
+
+    def render(self):
+        """Prometheus text exposition format."""
+        with self._lock:
+            series = sorted(self._series.items(), key=lambda item: item[0])
+            help_texts = dict(self._help)
+
+        lines = []
+        previous = None
+        for (name, labels), metric in series:
+            if name != previous:
+                if name in help_texts:
+                    lines.append(f"# HELP {name} {help_texts[name]}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                previous = name
+
+            if metric.kind != "histogram":
+                lines.append(f"{name}{_labels(labels)} {metric.sample()}")
+                continue
+
+            sample = metric.sample()
+            cumulative = 0
+            for bound, count in zip(metric.buckets, sample["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {sample['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {sample['sum']}")
+            lines.append(f"{name}_count{_labels(labels)} {sample['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Atomically replace path with the rendered metrics; safe to call from several threads."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # A temp file per call, so concurrent writers never share one
+        fd, tmp_path = tempfile.mkstemp(prefix=".metrics-", suffix=".tmp", dir=directory or ".")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.chmod(tmp_path, 0o644)  # mkstemp creates it owner-only
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def diff(before, after):
+    """Series that changed between two snapshots; gauges keep their latest value."""
+    changes = {"counter": {}, "gauge": {}, "histogram": {}}
+    for key, value in after["counter"].items():
+        delta = value - before["counter"].get(key, 0)
+        if delta:
+            changes["counter"][key] = delta
+    for key, value in after["gauge"].items():
+        if value != before["gauge"].get(key):
+            changes["gauge"][key] = value
+    for key, value in after["histogram"].items():
+        old = before["histogram"].get(key) or {
+            "count": 0, "sum": 0.0, "buckets": [0] * len(value["buckets"])
+        }
+        if value["count"] != old["count"]:
+            changes["histogram"][key] = {
+                "count": value["count"] - old["count"],
+                "sum": round(value["sum"] - old["sum"], 6),
+                "buckets": [a - b for a, b in zip(value["buckets"], old["buckets"])],
+            }
+    return changes
+
+
+def append_ledger(path, entry):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
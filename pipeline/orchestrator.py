@@ -0,0 +1,239 @@
+import time
+import queue
+import threading
+
+from pipeline.memory import SpilledBatch, estimate_bytes
+from pipeline.metrics import gauge, histogram
+
+_DONE = object()
+
+
+class PipelineMetrics:
+    """
+    Live counters for one pipeline run, safe to read from another thread:
+    queue depth as seen by the writer, time producers spent blocked on a
+    full queue, and the size and latency of every group commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.blocked_seconds = 0.0
+        self.commits = 0
+        self.committed_records = 0
+        self.commit_latencies = []
+
+    def sample_depth(self, depth):
+        with self._lock:
+            self.queue_depth = depth
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+            self.depth_samples += 1
+            self.depth_total += depth
+        gauge("pipeline_queue_depth", "Batches waiting for the writer").set(depth)
+
+    def add_blocked(self, seconds):
+        with self._lock:
+            self.blocked_seconds += seconds
+
+    def add_commit(self, records, seconds):
+        with self._lock:
+            self.commits += 1
+            self.committed_records += records
+            self.commit_latencies.append(seconds)
+        histogram("pipeline_commit_seconds", "Group commit latency").observe(seconds)
+
+    def snapshot(self):
+        with self._lock:
+            latencies = sorted(self.commit_latencies)
+
+            def pct(p):
+                if not latencies:
+                    return 0.0
+                return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+            return {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "mean_queue_depth": self.depth_total / self.depth_samples if self.depth_samples else 0.0,
+                "producer_blocked_seconds": round(self.blocked_seconds, 3),
+                "commits": self.commits,
+                "committed_records": self.committed_records,
+                "commit_p50_ms": round(pct(50) * 1000, 2),
+                "commit_p95_ms": round(pct(95) * 1000, 2),
+                "commit_max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+            }
+
+
+def run_concurrently(
+    producers,
+    start,
+    write,
+    finish,
+    queue_size=8,
+    commit_size=500,
+    commit_interval=2.0,
+    metrics=None,
+    budget=None,
+):
+    """
+    Run several sources at once with a single writer and group commit.
+
+    producers maps a source name to a callable returning an iterable of
+    record batches (or None when the source is unavailable). Each producer
+    runs on its own thread and puts batches into a queue of queue_size
+    batches, blocking while it is full. start(source) opens a run on the
+    producer's thread as it starts, so the run's duration covers fetching.
+    The calling thread is the only writer: write(run, records) stores
+    records and finish(run) closes it. Records are grouped per source and written
+    once commit_size are pending or the oldest has waited commit_interval
+    seconds. A callable in a batch stream is a checkpoint: pending records
+    are written first, then it is passed to write. Once a write for a source
+    has failed, its later checkpoints are dropped.
+
+    With a MemoryBudget, batches that would push the records in flight over
+    it are spilled to disk by the producer and read back by the writer in
+    commit_size chunks, and a source's pending records are also written once
+    they reach budget.commit_bytes.
+
+    Returns {source: {"status", "duration", "run", "result", "error"}} where
+    status is "ok", "skipped" (producer returned None) or "failed" and
+    result is what finish returned.
+    """
+    metrics = metrics or PipelineMetrics()
+    handoff = queue.Queue(maxsize=queue_size)
+    started = time.monotonic()
+    report = {
+        source: {"status": "ok", "duration": None, "run": None, "result": None, "error": None}
+        for source in producers
+    }
+
+    def put(item):
+        blocked = time.monotonic()
+        handoff.put(item)
+        metrics.add_blocked(time.monotonic() - blocked)
+
+    def put_batch(source, batch):
+        if budget is None or callable(batch):
+            put((source, batch, 0))
+            return
+        nbytes = estimate_bytes(batch)
+        if budget.reserve(nbytes):
+            put((source, batch, nbytes))
+        else:
+            put((source, budget.spill(batch), 0))
+
+    def produce(source, producer):
+        try:
+            batches = producer()
+            if batches is None:
+                report[source]["status"] = "skipped"
+                return
+            run_for(source)
+            for batch in batches:
+                put_batch(source, batch)
+        except Exception as e:
+            report[source]["status"] = "failed"
+            report[source]["error"] = str(e)
+        finally:
+            handoff.put((source, _DONE, 0))
+
+    runs = {}
+    runs_lock = threading.Lock()
+
+    def run_for(source):
+        with runs_lock:
+            if source not in runs:
+                runs[source] = report[source]["run"] = start(source)
+            return runs[source]
+
+    threads = [
+        threading.Thread(target=produce, args=(source, producer), name=f"source-{source}", daemon=True)
+        for source, producer in producers.items()
+    ]
+    for thread in threads:
+        thread.start()
+
+    pending = {}  # source -> records waiting for a group commit
+    deadlines = {}  # source -> when its oldest pending record must be written
+    pending_bytes = {}  # source -> budget reserved by its pending records
+    write_failed = set()  # sources whose checkpoints must no longer run
+
+    def flush(source):
+        records = pending.pop(source, None)
+        deadlines.pop(source, None)
+        reserved = pending_bytes.pop(source, 0)
+        if not records:
+            return
+        began = time.monotonic()
+        try:
+            write(run_for(source), records)
+        except Exception as e:
+            write_failed.add(source)
+            report[source]["status"] = "failed"
+            report[source]["error"] = str(e)
+        finally:
+            if budget is not None:
+                budget.release(reserved)
+        metrics.add_commit(len(records), time.monotonic() - began)
+
+    def add_pending(source, records, nbytes):
+        pending.setdefault(source, []).extend(records)
+        pending_bytes[source] = pending_bytes.get(source, 0) + nbytes
+        deadlines.setdefault(source, time.monotonic() + commit_interval)
+        if len(pending[source]) >= commit_size or (
+            budget is not None and pending_bytes[source] >= budget.commit_bytes
+        ):
+            flush(source)
+
+    def checkpoint(source, fn):
+        flush(source)
+        if source in write_failed:
+            return  # records before it were not all stored
+        try:
+            write(run_for(source), fn)
+        except Exception as e:
+            write_failed.add(source)
+            report[source]["status"] = "failed"
+            report[source]["error"] = str(e)
+
+    def flush_expired():
+        now = time.monotonic()
+        for expired in [s for s, due in deadlines.items() if due <= now]:
+            flush(expired)
+
+    remaining = len(threads)
+    while remaining:
+        timeout = None
+        if deadlines:
+            timeout = max(0.0, min(deadlines.values()) - time.monotonic())
+        try:
+            source, batch, nbytes = handoff.get(timeout=timeout)
+        except queue.Empty:
+            flush_expired()
+            continue
+        metrics.sample_depth(handoff.qsize())
+
+        if batch is _DONE:
+            remaining -= 1
+            flush(source)
+            with runs_lock:
+                run = runs.get(source)
+            if run is not None:
+                report[source]["result"] = finish(run)
+            report[source]["duration"] = time.monotonic() - started
+        elif callable(batch):
+            checkpoint(source, batch)
+        elif isinstance(batch, SpilledBatch):
+            for chunk in batch.chunks(commit_size):
+                add_pending(source, chunk, 0)
+        elif batch:
+            add_pending(source, batch, nbytes)
+        # A busy queue never times out, so deadlines are checked here too
+        flush_expired()
+
+    for thread in threads:
+        thread.join()
+    return report
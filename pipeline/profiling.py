@@ -0,0 +1,165 @@
+"""
+Opt-in cProfile + tracemalloc profiling of handlers and fetcher stages.
+
+    profiler = Profiler("output/profiles", every=10)
+    with profiler.profile("read_csv"):
+        ...
+
+Only every Nth run of each name is profiled (the count is kept in
+sampling.json, so it carries across processes), which keeps the overhead
+low enough to leave on. Each profiled run writes <stamp>-<name>.pstats for
+pstats/snakeviz and <stamp>-<name>.txt with the top functions by
+cumulative time and the top allocation sites.
+
+cProfile only sees the thread that started it, so fetcher stages are
+profiled on their own producer threads. A session started while another
+is active on the same thread is skipped (the outer one already covers
+it). tracemalloc is process-wide: allocation reports include whatever
+other threads did meanwhile.
+"""
+import io
+import os
+import json
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+
+class ProfileSession:
+    """One sampled run; end() stops profiling and writes the reports."""
+
+    def __init__(self, profiler, name, run_number):
+        self.profiler = profiler
+        self.name = name
+        self.run_number = run_number
+        self.started = time.perf_counter()
+        self.profile = cProfile.Profile()
+        try:
+            self.profile.enable()
+        except ValueError:  # some other profiler owns this thread
+            self.profile = None
+        profiler._start_tracing()
+        self.before = tracemalloc.take_snapshot()
+        self._ended = False
+
+    def end(self):
+        if self._ended:
+            return None
+        self._ended = True
+        self.profiler._active.session = None
+        if self.profile:
+            self.profile.disable()
+        elapsed = time.perf_counter() - self.started
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        self.profiler._stop_tracing()
+        return self.profiler._write(self, elapsed, after, peak)
+
+
+class Profiler:
+    def __init__(self, directory, every=1, top=30, enabled=True):
+        self.directory = directory
+        self.every = max(1, every)
+        self.top = top
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._tracing = 0  # open sessions; tracemalloc runs while > 0
+        self._started_tracing = False  # left alone if e.g. -X tracemalloc set it
+        self._active = threading.local()
+
+    # -------------------------
+    # Sampling
+    # -------------------------
+    def _counter_path(self):
+        return os.path.join(self.directory, "sampling.json")
+
+    def _next_run(self, name):
+        """Increment and return the persisted run counter for name."""
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            try:
+                with open(self._counter_path(), "r", encoding="utf-8") as f:
+                    counts = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                counts = {}
+            counts[name] = counts.get(name, 0) + 1
+            tmp_path = self._counter_path() + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(counts, f, indent=2)
+            os.replace(tmp_path, self._counter_path())
+            return counts[name]
+
+    def begin(self, name):
+        """Start a session if this run of name is sampled, else return None."""
+        if not self.enabled or getattr(self._active, "session", None):
+            return None
+        run_number = self._next_run(name)
+        if (run_number - 1) % self.every:
+            return None
+        self._active.session = ProfileSession(self, name, run_number)
+        return self._active.session
+
+    @contextmanager
+    def profile(self, name):
+        session = self.begin(name)
+        try:
+            yield session
+        finally:
+            if session:
+                session.end()
+
+    def call(self, name, fn, *args, **kwargs):
+        with self.profile(name):
+            return fn(*args, **kwargs)
+
+    # -------------------------
+    # tracemalloc bookkeeping
+    # -------------------------
+    def _start_tracing(self):
+        with self._lock:
+            if not self._tracing and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._tracing += 1
+
+    def _stop_tracing(self):
+        with self._lock:
+            self._tracing -= 1
+            if self._tracing == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    # -------------------------
+    # Reports
+    # -------------------------
+    def _write(self, session, elapsed, after, peak):
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        base = os.path.join(self.directory, f"{stamp}-{session.name}")
+        os.makedirs(self.directory, exist_ok=True)
+
+        lines = [
+            f"{session.name} run #{session.run_number} "
+            f"(profiling every {self.every}), thread {threading.current_thread().name}",
+            f"wall time: {elapsed:.3f}s, peak traced memory: {peak / 1024 / 1024:.1f} MB",
+            "",
+        ]
+
+        if session.profile:
+            session.profile.dump_stats(base + ".pstats")
+            stream = io.StringIO()
+            stats = pstats.Stats(session.profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(self.top)
+            lines.append(f"Top {self.top} functions by cumulative time")
+            lines.append(stream.getvalue())
+
+        lines.append(f"Top {self.top} allocation sites (growth during the run)")
+        for stat in after.compare_to(session.before, "lineno")[: self.top]:
+            lines.append(str(stat))
+
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        return base + ".txt"
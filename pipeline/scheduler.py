@@ -0,0 +1,81 @@
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger("ingestion")
+
+
+class Scheduler:
+    """
+    Run each source on its own interval in a long-lived process.
+
+    jobs maps a source name to its interval in seconds; run(source) does
+    one ingestion. Every run gets its own thread, and a source whose
+    previous run is still going is skipped for that tick rather than
+    started twice. Each next run time is the interval scaled by a random
+    +/- jitter fraction so sources with the same interval drift apart.
+    """
+
+    def __init__(self, jobs, run, jitter=0.1, poll_interval=1.0):
+        self.jobs = dict(jobs)
+        self.run = run
+        self.jitter = jitter
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self._threads = {}
+        self._next = {}
+        self.skipped = {source: 0 for source in self.jobs}
+
+    def _delay(self, interval):
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _start(self, source):
+        def work():
+            try:
+                self.run(source)
+            except Exception as e:
+                logger.error(f"[scheduler] {source} run failed: {e}")
+
+        thread = threading.Thread(target=work, name=f"scheduled-{source}", daemon=True)
+        self._threads[source] = thread
+        thread.start()
+
+    def tick(self, now=None):
+        """Start every due source; returns the sources started."""
+        now = time.monotonic() if now is None else now
+        started = []
+        for source, interval in self.jobs.items():
+            if now < self._next.get(source, now):
+                continue
+            self._next[source] = now + self._delay(interval)
+
+            running = self._threads.get(source)
+            if running and running.is_alive():
+                self.skipped[source] += 1
+                logger.warning(f"[scheduler] {source} still running, skipping this run")
+                continue
+            self._start(source)
+            started.append(source)
+        return started
+
+    def run_forever(self):
+        logger.info(
+            "[scheduler] Started: "
+            + ", ".join(f"{s} every {i}s" for s, i in self.jobs.items())
+        )
+        # First runs are spread over the jitter window instead of all firing at once
+        now = time.monotonic()
+        for source, interval in self.jobs.items():
+            self._next[source] = now + random.uniform(0, interval * self.jitter)
+
+        while not self.stop_event.is_set():
+            self.tick()
+            self.stop_event.wait(self.poll_interval)
+
+        for thread in self._threads.values():
+            thread.join()
+        logger.info("[scheduler] Stopped")
+
+    def stop(self):
+        self.stop_event.set()
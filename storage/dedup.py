@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+# Fields that identify a record per source; None hashes the whole payload
+KEY_FIELDS = {
+    "web": ("url", "error"),
+    "newsapi": ("id",),
+    "csv": None,
+}
+
+# Set at fetch/append time, so they must never influence the id
+VOLATILE_FIELDS = {"_id", "_timestamp", "_source", "fetched_at", "status"}
+
+
+def _normalize_url(url):
+    parts = urlsplit(url.strip())
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, "")
+    )
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def record_id(record: dict, source: str) -> str:
+    """
+    Deterministic id for a record: a hash of its canonical key fields (or of
+    the whole normalized payload), identical across processes and runs.
+    """
+    fields = KEY_FIELDS.get(source)
+    payload = {}
+    if fields:
+        payload = {f: record[f] for f in fields if record.get(f) is not None}
+        if isinstance(payload.get("url"), str):
+            payload["url"] = _normalize_url(payload["url"])
+    if not payload:
+        payload = {k: v for k, v in record.items() if k not in VOLATILE_FIELDS}
+
+    canonical = json.dumps(
+        _normalize(payload), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    )
+    digest = hashlib.blake2b(
+        f"{source}\0{canonical}".encode("utf-8"), digest_size=12
+    ).hexdigest()
+    return f"{source}_{digest}"
+
+
+class DedupIndex:
+    """
+    Persistent set of record ids already in the store. Ids live in an
+    append-only file, one per line, and in a set in memory, so each lookup
+    at append time is O(1).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ids = None
+
+    def _load(self):
+        if self._ids is not None:
+            return
+        self._ids = set()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._ids.update(line.strip() for line in f if line.strip())
+
+    def __contains__(self, record_id):
+        self._load()
+        return record_id in self._ids
+
+    def __len__(self):
+        self._load()
+        return len(self._ids)
+
+    def filter_new(self, records):
+        """Split records into (new, duplicate_count) using their _id, also within the batch."""
+        self._load()
+        new, seen, duplicates = [], set(), 0
+        for record in records:
+            rid = record["_id"]
+            if rid in self._ids or rid in seen:
+                duplicates += 1
+                continue
+            seen.add(rid)
+            new.append(record)
+        return new, duplicates
+
+    def add(self, ids):
+        self._load()
+        ids = [i for i in ids if i not in self._ids]
+        if not ids:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{i}\n" for i in ids))
+        self._ids.update(ids)
+
+    def clear(self):
+        self._ids = set()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def rebuild(self, records):
+        """Recreate the index from the ids of stored records."""
+        self.clear()
+        self.add(r["_id"] for r in records if "_id" in r)
@@ -0,0 +1,25 @@
+import os
+import json
+
+
+def export_json(records, output_file: str) -> int:
+    """
+    Write records as one indented JSON array, the original scraped_data.json
+    format, streaming them so the whole store is never held in memory.
+    """
+    directory = os.path.dirname(output_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    count = 0
+    tmp_path = output_file + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for record in records:
+            item = json.dumps(record, indent=2, ensure_ascii=False)
+            f.write(",\n  " if count else "\n  ")
+            f.write(item.replace("\n", "\n  "))
+            count += 1
+        f.write("\n]" if count else "]")
+    os.replace(tmp_path, output_file)
+    return count
@@ -0,0 +1,160 @@
+import os
+import json
+
+from storage.export import export_json
+
+
+class JSONLStore:
+    """
+    Append-only record store backed by a newline-delimited JSON file.
+    Appends only write the new records; reads stream one line at a time.
+    """
+
+    def __init__(self, path: str, legacy_path: str = None):
+        self.path = path
+        self.legacy_path = legacy_path
+        self._migrated = False
+
+    # -------------------------
+    # Migration
+    # -------------------------
+    def _migrate(self):
+        """One-time conversion of a legacy JSON array file into JSONL."""
+        if self._migrated:
+            return
+        self._migrated = True
+
+        if self._is_json_array(self.path):
+            self._convert(self.path, self.path)
+        elif (
+            self.legacy_path
+            and not os.path.exists(self.path)
+            and self._is_json_array(self.legacy_path)
+        ):
+            self._convert(self.legacy_path, self.path)
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    @staticmethod
+    def _is_json_array(path):
+        if not path or not os.path.exists(path):
+            return False
+        with open(path, "r", encoding="utf-8") as f:
+            head = f.read(64).lstrip()
+        return head.startswith("[")
+
+    def _convert(self, src, dst):
+        try:
+            with open(src, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except json.JSONDecodeError:
+            records = []
+
+        if not isinstance(records, list):
+            records = []
+
+        self._ensure_dir()
+        tmp_path = dst + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, dst)
+        print(f"✓ Migrated {len(records)} records to {os.path.basename(dst)}")
+
+    def _ensure_dir(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def append(self, records) -> int:
+        """Append records to the end of the store and return how many were written."""
+        self._migrate()
+        self._ensure_dir()
+
+        written = 0
+        needs_newline = self._ends_mid_line()
+        with open(self.path, "a", encoding="utf-8") as f:
+            if needs_newline:
+                f.write("\n")  # don't glue onto a line cut short by a crash
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += 1
+        return written
+
+    def _ends_mid_line(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return False
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+    def replace(self, records) -> int:
+        """Atomically replace the whole store with the given records."""
+        self._migrate()
+        self._ensure_dir()
+
+        written = 0
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                written += 1
+        os.replace(tmp_path, self.path)
+        return written
+
+    def clear(self):
+        self.replace([])
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def iter_records(self, source=None, since=None, until=None):
+        """
+        Yield stored records one by one, skipping corrupt lines, optionally
+        filtered by source and _timestamp range.
+        """
+        self._migrate()
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+                if source and record.get("_source") != source:
+                    continue
+                timestamp = record.get("_timestamp", "")
+                if since and timestamp < since:
+                    continue
+                if until and timestamp >= until:
+                    continue
+                yield record
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def count(self) -> int:
+        return sum(1 for _ in self.iter_records())
+
+    def fingerprint(self):
+        """Cheap change detector used by the stats sidecar."""
+        self._migrate()
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def count_by_source(self) -> dict:
+        sources = {}
+        for record in self.iter_records():
+            source = record.get("_source")
+            sources[source] = sources.get(source, 0) + 1
+        return sources
+
+    def export_json(self, output_file: str) -> int:
+        return export_json(self.iter_records(), output_file)
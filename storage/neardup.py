@@ -0,0 +1,244 @@
+import os
+import zlib
+import random
+from array import array
+
+from storage.search import tokenize
+
+TEXT_FIELDS = ("title", "name", "description", "content")
+MIN_TOKENS = 8  # shorter texts (error records, numeric CSV rows) are never near-dup checked
+MERSENNE_PRIME = (1 << 31) - 1
+
+_numpy = []  # imported on first signature, so startup does not pay for it
+
+
+def _get_numpy():
+    """numpy, or None when it is not installed (signatures fall back to pure Python)."""
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+
+def record_text(record):
+    return " ".join(str(record[f]) for f in TEXT_FIELDS if record.get(f))
+
+
+def shingles(tokens, size):
+    """Stable 32-bit hashes of the word n-grams of a token list."""
+    if len(tokens) < size:
+        return {zlib.crc32(" ".join(tokens).encode("utf-8"))}
+    return {
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+def choose_bands(num_perm, threshold):
+    """
+    (bands, rows) with bands * rows == num_perm whose LSH threshold
+    (1/bands) ** (1/rows) is closest to, and preferably below, threshold.
+    Erring low costs a few extra candidate checks instead of missed matches.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        estimate = (1 / bands) ** (1 / rows)
+        penalty = abs(estimate - threshold) + (0.05 if estimate > threshold else 0)
+        if best is None or penalty < best[0]:
+            best = (penalty, bands, rows)
+    return best[1], best[2]
+
+
+class NearDupIndex:
+    """
+    MinHash signatures of record text bucketed by LSH bands, so finding
+    records with estimated Jaccard similarity >= threshold only compares
+    against records sharing a band instead of the whole store.
+
+    Signatures are kept in an append-only file (<_id>\\t<hex signature> per
+    line) and the band buckets are rebuilt from it on first use.
+    """
+
+    def __init__(self, path: str, threshold=0.8, num_perm=128, shingle_size=3, seed=1):
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = choose_bands(num_perm, threshold)
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)]
+        self._np_a = self._np_b = None
+
+        self._signatures = None
+        self._buckets = None
+        self._pending = {}
+
+    # -------------------------
+    # Signatures
+    # -------------------------
+    def signature(self, text):
+        """MinHash signature of a text, or None when it is too short to compare."""
+        tokens = tokenize(text)
+        if len(tokens) < MIN_TOKENS:
+            return None
+        hashes = shingles(tokens, self.shingle_size)
+
+        np = _get_numpy()
+        if np is not None:
+            if self._np_a is None:
+                self._np_a = np.array(self._a, dtype=np.uint64)[:, None]
+                self._np_b = np.array(self._b, dtype=np.uint64)[:, None]
+            x = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))[None, :]
+            values = ((self._np_a * x + self._np_b) % MERSENNE_PRIME).min(axis=1)
+            return array("I", values.astype(np.uint32).tobytes())
+
+        return array(
+            "I",
+            (
+                min((a * x + b) % MERSENNE_PRIME for x in hashes)
+                for a, b in zip(self._a, self._b)
+            ),
+        )
+
+    def similarity(self, first, second):
+        """Estimated Jaccard similarity of two signatures."""
+        return sum(1 for x, y in zip(first, second) if x == y) / self.num_perm
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [
+            (band, signature[band * rows:(band + 1) * rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _load(self):
+        if self._signatures is not None:
+            return
+        self._signatures = {}
+        self._buckets = {}
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                rid, _, hexsig = line.strip().partition("\t")
+                if not hexsig:
+                    continue
+                signature = array("I")
+                signature.frombytes(bytes.fromhex(hexsig))
+                if len(signature) == self.num_perm:
+                    self._index(rid, signature)
+
+    def _index(self, rid, signature):
+        self._signatures[rid] = signature
+        for key in self._band_keys(signature):
+            self._buckets.setdefault(key, []).append(rid)
+
+    def __len__(self):
+        self._load()
+        return len(self._signatures)
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def find(self, signature, extra=None):
+        """
+        Best stored record (id, similarity) at or above the threshold, or None.
+        extra: optional {key: [ids]} buckets of records not yet stored.
+        """
+        self._load()
+        best = None
+        seen = set()
+        for key in self._band_keys(signature):
+            for buckets in (self._buckets, extra or {}):
+                for rid in buckets.get(key, ()):
+                    if rid in seen:
+                        continue
+                    seen.add(rid)
+                    other = self._signatures.get(rid) or self._pending.get(rid)
+                    score = self.similarity(signature, other)
+                    if score >= self.threshold and (best is None or score > best[1]):
+                        best = (rid, score)
+        return best
+
+    def filter(self, records, mode="drop"):
+        """
+        Check records against the index and against each other.
+
+        mode "drop" returns only the non-duplicates; mode "link" keeps every
+        record but sets _duplicate_of and _similarity on near-duplicates.
+        Returns (records, near_duplicate_count). Signatures of the canonical
+        records are held until add() is called with their ids.
+        """
+        self._load()
+        kept, found = [], 0
+        batch_buckets = {}
+        for record in records:
+            signature = self.signature(record_text(record))
+            if signature is None:
+                kept.append(record)
+                continue
+
+            match = self.find(signature, batch_buckets)
+            if match:
+                found += 1
+                if mode == "link":
+                    record["_duplicate_of"], record["_similarity"] = match[0], round(match[1], 3)
+                    kept.append(record)
+                continue
+
+            rid = record["_id"]
+            self._pending[rid] = signature
+            for key in self._band_keys(signature):
+                batch_buckets.setdefault(key, []).append(rid)
+            kept.append(record)
+        return kept, found
+
+    def add(self, ids):
+        """Persist the pending signatures of records that were written to the store."""
+        self._load()
+        lines = []
+        for rid in ids:
+            signature = self._pending.pop(rid, None)
+            if signature is None or rid in self._signatures:
+                continue
+            self._index(rid, signature)
+            lines.append(f"{rid}\t{signature.tobytes().hex()}\n")
+        self._pending.clear()
+        if not lines:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+
+    def clear(self):
+        self._signatures = {}
+        self._buckets = {}
+        self._pending = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def rebuild(self, records):
+        """Recreate the index from stored records, skipping ones linked as duplicates."""
+        self.clear()
+        ids = []
+        for record in records:
+            if "_id" not in record or record.get("_duplicate_of"):
+                continue
+            signature = self.signature(record_text(record))
+            if signature is not None:
+                self._pending[record["_id"]] = signature
+                ids.append(record["_id"])
+        self.add(ids)
@@ -0,0 +1,411 @@
+import os
+import re
+import json
+import math
+import heapq
+from array import array
+from collections import Counter
+from datetime import datetime
+
+TOKEN = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or that "
+    "the this to was were will with".split()
+)
+TITLE_FIELDS = ("title", "name")  # indexed twice as a simple field boost
+BODY_FIELDS = ("description", "content")
+MAX_TOKEN_LENGTH = 40
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return [
+        t
+        for t in TOKEN.findall(text.lower())
+        if 1 < len(t) <= MAX_TOKEN_LENGTH and t not in STOPWORDS
+    ]
+
+
+def _epoch(timestamp):
+    """Seconds since the epoch for an ISO timestamp or date; 0.0 if unparseable."""
+    if not timestamp:
+        return 0.0
+    try:
+        return datetime.fromisoformat(str(timestamp).rstrip("Z")).timestamp()
+    except ValueError:
+        return 0.0
+
+
+# -------------------------
+# Posting list encoding
+# -------------------------
+def _varint(value, out: bytearray):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, i):
+    value = shift = 0
+    while True:
+        byte = data[i]
+        i += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, i
+        shift += 7
+
+
+def encode_postings(postings) -> bytes:
+    """(doc, tf) pairs with ascending doc ids -> varint doc-id deltas and term frequencies."""
+    out = bytearray()
+    previous = 0
+    for doc, tf in postings:
+        _varint(doc - previous, out)
+        _varint(tf, out)
+        previous = doc
+    return bytes(out)
+
+
+def rebase_postings(data: bytes, previous: int) -> bytes:
+    """
+    Re-encode a posting list so it can follow one ending at doc `previous`.
+    Only the first delta is absolute, so every later byte is copied as-is.
+    """
+    first, i = _read_varint(data, 0)
+    out = bytearray()
+    _varint(first - previous, out)
+    return bytes(out) + data[i:]
+
+
+def decode_postings(data: bytes):
+    """Inverse of encode_postings; returns (docs, tfs) lists."""
+    docs, tfs = [], []
+    doc = 0
+    i = 0
+    n = len(data)
+    while i < n:
+        value = shift = 0
+        while True:
+            byte = data[i]
+            i += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        doc += value
+
+        tf = shift = 0
+        while True:
+            byte = data[i]
+            i += 1
+            tf |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+
+        docs.append(doc)
+        tfs.append(tf)
+    return docs, tfs
+
+
+class InvertedIndex:
+    """
+    On-disk full-text index over stored records, maintained at append time.
+
+    Every add() writes a new immutable segment: a term dictionary
+    (seg-N.terms) pointing into a postings file (seg-N.post) of
+    delta-encoded doc ids. Segments are merged in tiers of merge_factor
+    (see _merge_tiers) so their number stays logarithmic in the record count. Per-document
+    timestamp, source and length live in flat arrays for filtering and
+    BM25 scoring; ids and titles for display in docs.jsonl.
+    """
+
+    def __init__(self, root: str, merge_factor: int = 8):
+        self.root = root
+        self.merge_factor = merge_factor
+        self._meta = None
+        self._arrays = None
+        self._terms = {}
+
+    # -------------------------
+    # Persistence
+    # -------------------------
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def _load(self):
+        if self._meta is not None:
+            return
+        try:
+            with open(self._path("meta.json"), "r", encoding="utf-8") as f:
+                self._meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self._meta = {
+                "doc_count": 0,
+                "total_length": 0,
+                "sources": [],
+                "next_segment": 1,
+                "segments": [],
+            }
+
+        count = self._meta["doc_count"]
+        self._arrays = {}
+        for name, typecode in (("ts", "d"), ("src", "H"), ("len", "I"), ("offsets", "Q")):
+            values = array(typecode)
+            path = self._path(f"docs.{name}")
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    values.frombytes(f.read(count * values.itemsize))
+            self._arrays[name] = values
+
+    def _save_meta(self):
+        tmp_path = self._path("meta.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(self._meta))
+        os.replace(tmp_path, self._path("meta.json"))
+
+    def _segment_terms(self, name):
+        if name not in self._terms:
+            with open(self._path(f"{name}.terms"), "r", encoding="utf-8") as f:
+                self._terms[name] = json.load(f)
+        return self._terms[name]
+
+    def _write_segment(self, postings):
+        """
+        postings: term -> (encoded posting list, df, last doc id); returns the
+        new segment name.
+        """
+        name = f"seg-{self._meta['next_segment']:06d}"
+        self._meta["next_segment"] += 1
+
+        terms = {}
+        offset = 0
+        with open(self._path(f"{name}.post"), "wb") as f:
+            for term in sorted(postings):
+                data, df, last = postings[term]
+                f.write(data)
+                terms[term] = [offset, len(data), df, last]
+                offset += len(data)
+        with open(self._path(f"{name}.terms"), "w", encoding="utf-8") as f:
+            f.write(json.dumps(terms, separators=(",", ":")))
+
+        self._terms[name] = terms
+        return name
+
+    # -------------------------
+    # Indexing
+    # -------------------------
+    def __len__(self):
+        self._load()
+        return self._meta["doc_count"]
+
+    def add(self, records) -> int:
+        """Index records (with _id/_source/_timestamp) as one new segment."""
+        self._load()
+        os.makedirs(self.root, exist_ok=True)
+        meta = self._meta
+        arrays = self._arrays
+        sources = meta["sources"]
+
+        doc = meta["doc_count"]
+        postings = {}
+        new_arrays = {name: array(values.typecode) for name, values in arrays.items()}
+        with open(self._path("docs.jsonl"), "ab") as docs_file:
+            offset = docs_file.tell()
+            for record in records:
+                tokens = []
+                for field in TITLE_FIELDS:
+                    tokens.extend(tokenize(str(record.get(field) or "")) * 2)
+                for field in BODY_FIELDS:
+                    tokens.extend(tokenize(str(record.get(field) or "")))
+                for term, tf in Counter(tokens).items():
+                    postings.setdefault(term, []).append((doc, tf))
+
+                source = record.get("_source") or "unknown"
+                if source not in sources:
+                    sources.append(source)
+                line = json.dumps(
+                    {
+                        "_id": record.get("_id"),
+                        "_source": source,
+                        "_timestamp": record.get("_timestamp"),
+                        "title": record.get("title") or record.get("name"),
+                        "url": record.get("url"),
+                    },
+                    ensure_ascii=False,
+                ).encode("utf-8") + b"\n"
+                docs_file.write(line)
+
+                new_arrays["ts"].append(_epoch(record.get("_timestamp")))
+                new_arrays["src"].append(sources.index(source))
+                new_arrays["len"].append(len(tokens))
+                new_arrays["offsets"].append(offset)
+                offset += len(line)
+                meta["total_length"] += len(tokens)
+                doc += 1
+
+        added = doc - meta["doc_count"]
+        if not added:
+            return 0
+
+        for name, values in new_arrays.items():
+            with open(self._path(f"docs.{name}"), "ab") as f:
+                # Drop bytes past doc_count left over from an interrupted add
+                f.truncate(meta["doc_count"] * values.itemsize)
+                values.tofile(f)
+            arrays[name].extend(values)
+
+        if postings:
+            encoded = {
+                term: (encode_postings(pairs), len(pairs), pairs[-1][0])
+                for term, pairs in postings.items()
+            }
+            meta["segments"].append({"name": self._write_segment(encoded), "docs": added})
+        meta["doc_count"] = doc
+        self._save_meta()
+        self._merge_tiers()
+        return added
+
+    def _level(self, docs):
+        return int(math.log(max(docs, 1), self.merge_factor))
+
+    def _merge_tiers(self):
+        """
+        Merge the trailing run of segments at or below the newest segment's
+        level once it has merge_factor of them. A merged segment moves up a
+        level and may complete the run above it, so this repeats.
+        """
+        segments = self._meta["segments"]
+        while len(segments) >= self.merge_factor:
+            level = self._level(segments[-1]["docs"])
+            start = len(segments)
+            while start and self._level(segments[start - 1]["docs"]) <= level:
+                start -= 1
+            if len(segments) - start < self.merge_factor:
+                break
+            self._merge(start, len(segments))
+
+    def _merge(self, start, end):
+        """Merge segments[start:end] (adjacent, so doc ids stay ascending) into one."""
+        segments = self._meta["segments"]
+        merging = segments[start:end]
+
+        merged = {}
+        for segment in merging:
+            name = segment["name"]
+            terms = self._segment_terms(name)
+            with open(self._path(f"{name}.post"), "rb") as f:
+                data = f.read()
+            for term, (offset, length, df, last) in terms.items():
+                postings = data[offset:offset + length]
+                if term in merged:
+                    chunks, total, previous = merged[term]
+                    chunks.append(rebase_postings(postings, previous))
+                    merged[term] = (chunks, total + df, last)
+                else:
+                    merged[term] = ([postings], df, last)
+
+        merged = {
+            term: (b"".join(chunks), df, last) for term, (chunks, df, last) in merged.items()
+        }
+        name = self._write_segment(merged)
+        segments[start:end] = [{"name": name, "docs": sum(s["docs"] for s in merging)}]
+        self._save_meta()
+
+        for segment in merging:
+            self._terms.pop(segment["name"], None)
+            for suffix in (".post", ".terms"):
+                os.remove(self._path(segment["name"] + suffix))
+
+    def optimize(self):
+        """Merge every segment into one."""
+        self._load()
+        if len(self._meta["segments"]) > 1:
+            self._merge(0, len(self._meta["segments"]))
+
+    def clear(self):
+        if os.path.isdir(self.root):
+            for name in os.listdir(self.root):
+                os.remove(self._path(name))
+        self._meta = None
+        self._arrays = None
+        self._terms = {}
+
+    def rebuild(self, records, batch_size=10000) -> int:
+        """Re-index every record from the store."""
+        self.clear()
+        total = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                total += self.add(batch)
+                batch = []
+        if batch:
+            total += self.add(batch)
+        return total
+
+    # -------------------------
+    # Querying
+    # -------------------------
+    def search(self, query, source=None, since=None, until=None, limit=10):
+        """
+        Rank documents matching any query term with BM25. source restricts to
+        one _source; since/until bound _timestamp (ISO date or datetime,
+        until exclusive). Returns dicts with _id, title, url, _source,
+        _timestamp and score, best first.
+        """
+        self._load()
+        meta = self._meta
+        doc_count = meta["doc_count"]
+        terms = set(tokenize(query))
+        if not doc_count or not terms:
+            return []
+
+        arrays = self._arrays
+        timestamps, source_codes, lengths = arrays["ts"], arrays["src"], arrays["len"]
+        avg_length = meta["total_length"] / doc_count or 1.0
+        source_code = meta["sources"].index(source) if source in meta["sources"] else None
+        if source and source_code is None:
+            return []
+        since_ts = _epoch(since) if since else None
+        until_ts = _epoch(until) if until else None
+
+        scores = {}
+        for term in terms:
+            locations = []
+            for segment in meta["segments"]:
+                entry = self._segment_terms(segment["name"]).get(term)
+                if entry:
+                    locations.append((segment["name"], entry))
+            df = sum(entry[2] for _, entry in locations)
+            if not df:
+                continue
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+
+            for name, (offset, length, _, _) in locations:
+                with open(self._path(f"{name}.post"), "rb") as f:
+                    f.seek(offset)
+                    docs, tfs = decode_postings(f.read(length))
+                for doc, tf in zip(docs, tfs):
+                    if source_code is not None and source_codes[doc] != source_code:
+                        continue
+                    if since_ts is not None and timestamps[doc] < since_ts:
+                        continue
+                    if until_ts is not None and timestamps[doc] >= until_ts:
+                        continue
+                    norm = K1 * (1 - B + B * lengths[doc] / avg_length)
+                    scores[doc] = scores.get(doc, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [dict(self._document(doc), score=round(score, 4)) for doc, score in best]
+
+    def _document(self, doc):
+        with open(self._path("docs.jsonl"), "rb") as f:
+            f.seek(self._arrays["offsets"][doc])
+            return json.loads(f.readline())
@@ -0,0 +1,305 @@
+import os
+import re
+import gzip
+import json
+import lzma
+import shutil
+import threading
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+
+from storage.export import export_json
+
+CODECS = {
+    "gzip": (".jsonl.gz", gzip.open),
+    "lzma": (".jsonl.xz", lzma.open),
+}
+APPEND_CHUNK = 1000  # records buffered per partition before they are written
+SEGMENT_NAME = re.compile(r"^seg-(\d{6})(\.jsonl(?:\.gz|\.xz)?)$")
+DAY_NAME = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+def _open_segment(path, mode="rt"):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, encoding="utf-8")
+    if path.endswith(".xz"):
+        return lzma.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class SegmentedStore:
+    """
+    Record store split into time partitions: root/<source>/<YYYY-MM-DD>/seg-NNNNNN.jsonl.
+
+    Range reads only open partitions whose day can match, retention drops
+    whole day directories, and compaction merges the small segments of
+    closed days into gzip or lzma compressed ones.
+    """
+
+    def __init__(self, root: str, max_segment_bytes=64 * 1024 * 1024, codec="gzip"):
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}' (available: {', '.join(CODECS)})")
+        self.root = root
+        self.max_segment_bytes = max_segment_bytes
+        self.codec = codec
+        self._lock = threading.Lock()
+        self._compactor = None
+
+    # -------------------------
+    # Layout helpers
+    # -------------------------
+    @staticmethod
+    def _day(record):
+        timestamp = record.get("_timestamp") or datetime.utcnow().isoformat()
+        return timestamp[:10]
+
+    @staticmethod
+    def _safe(name):
+        return re.sub(r"[^\w.-]", "_", name or "unknown")
+
+    def _partitions(self, source=None, since=None, until=None):
+        """(source, day, path) for partitions that may hold matching records, oldest first."""
+        if not os.path.isdir(self.root):
+            return []
+
+        sources = [self._safe(source)] if source else sorted(os.listdir(self.root))
+        partitions = []
+        for src in sources:
+            src_dir = os.path.join(self.root, src)
+            if not os.path.isdir(src_dir):
+                continue
+            for day in os.listdir(src_dir):
+                if not DAY_NAME.match(day):
+                    continue
+                if since and day < since[:10]:
+                    continue
+                if until and day > until[:10]:
+                    continue
+                partitions.append((day, src, os.path.join(src_dir, day)))
+        return [(src, day, path) for day, src, path in sorted(partitions)]
+
+    @staticmethod
+    def _segments(partition):
+        """(number, path) of every segment in a partition, in write order."""
+        segments = []
+        for name in os.listdir(partition):
+            match = SEGMENT_NAME.match(name)
+            if match:
+                segments.append((int(match.group(1)), os.path.join(partition, name)))
+        return sorted(segments)
+
+    def _active_segment(self, partition):
+        segments = self._segments(partition)
+        if segments:
+            number, path = segments[-1]
+            if path.endswith(".jsonl") and os.path.getsize(path) < self.max_segment_bytes:
+                return path
+            return os.path.join(partition, f"seg-{number + 1:06d}.jsonl")
+        return os.path.join(partition, "seg-000001.jsonl")
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def append(self, records) -> int:
+        """
+        Write records into the active segment of their (source, day) partition.
+        records may be any iterable; at most APPEND_CHUNK records per partition
+        are held before they are written.
+        """
+        groups = {}
+        written = 0
+        for record in records:
+            key = (self._safe(record.get("_source")), self._day(record))
+            group = groups.setdefault(key, [])
+            group.append(record)
+            if len(group) >= APPEND_CHUNK:
+                written += self._write_group(key, group)
+                del groups[key]
+        for key, group in groups.items():
+            written += self._write_group(key, group)
+        return written
+
+    def _write_group(self, key, group) -> int:
+        source, day = key
+        partition = os.path.join(self.root, source, day)
+        with self._lock:
+            os.makedirs(partition, exist_ok=True)
+            with open(self._active_segment(partition), "a", encoding="utf-8") as f:
+                for record in group:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return len(group)
+
+    def replace(self, records) -> int:
+        self.clear()
+        return self.append(records)
+
+    def clear(self):
+        with self._lock:
+            if os.path.isdir(self.root):
+                shutil.rmtree(self.root)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def iter_records(self, source=None, since=None, until=None):
+        """Yield records, opening only the partitions inside the requested range."""
+        for _, _, partition in self._partitions(source, since, until):
+            with ExitStack() as stack:
+                # Compaction removes segments only under the lock, and an open
+                # file stays readable after it is removed, so opening the whole
+                # partition at once gives a consistent view of it
+                with self._lock:
+                    try:
+                        files = [
+                            stack.enter_context(_open_segment(path))
+                            for _, path in self._segments(partition)
+                        ]
+                    except FileNotFoundError:
+                        continue  # dropped by retention meanwhile
+                for f in files:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+
+                        timestamp = record.get("_timestamp", "")
+                        if since and timestamp < since:
+                            continue
+                        if until and timestamp >= until:
+                            continue
+                        yield record
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def count(self) -> int:
+        return sum(1 for _ in self.iter_records())
+
+    def fingerprint(self):
+        """
+        Cheap change detector used by the stats sidecar: the partition listing.
+        It changes when retention drops partitions or a new day starts, but not
+        when compaction rewrites segments without changing their records.
+        """
+        return [f"{source}/{day}" for source, day, _ in self._partitions()]
+
+    def count_by_source(self) -> dict:
+        sources = {}
+        for record in self.iter_records():
+            source = record.get("_source")
+            sources[source] = sources.get(source, 0) + 1
+        return sources
+
+    def export_json(self, output_file: str) -> int:
+        return export_json(self.iter_records(), output_file)
+
+    # -------------------------
+    # Retention
+    # -------------------------
+    def drop_before(self, day: str) -> int:
+        """Delete every partition older than day (YYYY-MM-DD); returns how many were dropped."""
+        dropped = 0
+        with self._lock:
+            for _, partition_day, partition in self._partitions():
+                if partition_day < day:
+                    shutil.rmtree(partition)
+                    dropped += 1
+        return dropped
+
+    def apply_retention(self, days: int) -> int:
+        cutoff = (datetime.utcnow() - timedelta(days=days)).strftime("%Y-%m-%d")
+        return self.drop_before(cutoff)
+
+    # -------------------------
+    # Compaction
+    # -------------------------
+    def compact(self, small_bytes=8 * 1024 * 1024) -> int:
+        """
+        Merge consecutive small segments of closed (before today) partitions
+        into one compressed segment each; returns the number of segments removed.
+
+        Segments are copied without holding the lock, so late records for a
+        past day can still be appended meanwhile. A run whose segments changed
+        during the copy is left for the next pass. Output left behind by an
+        interrupted pass is deleted first.
+        """
+        suffix, opener = CODECS[self.codec]
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        removed = 0
+
+        for _, day, partition in self._partitions(until=today):
+            if day >= today:
+                continue  # still receiving appends
+            for name in os.listdir(partition):
+                if name.startswith("seg-") and name.endswith(".tmp"):
+                    os.remove(os.path.join(partition, name))
+            for run in self._small_runs(partition, small_bytes):
+                if len(run) == 1 and not run[0][1].endswith(".jsonl"):
+                    continue
+
+                number = run[0][0]
+                target = os.path.join(partition, f"seg-{number:06d}{suffix}")
+                tmp_path = target + ".tmp"
+                sizes = [os.path.getsize(path) for _, path in run]
+                with opener(tmp_path, "wt", encoding="utf-8") as out:
+                    for _, path in run:
+                        with _open_segment(path) as f:
+                            shutil.copyfileobj(f, out)
+
+                with self._lock:
+                    if self._sizes(run) != sizes:
+                        os.remove(tmp_path)  # appended to meanwhile
+                        continue
+                    # The merged segment is in place before any input goes,
+                    # so a crash in between duplicates records rather than losing them
+                    os.replace(tmp_path, target)
+                    for _, path in run:
+                        if path != target:
+                            os.remove(path)
+                removed += len(run) - 1
+        return removed
+
+    @staticmethod
+    def _sizes(run):
+        try:
+            return [os.path.getsize(path) for _, path in run]
+        except OSError:
+            return None
+
+    @staticmethod
+    def _small_runs(partition, small_bytes):
+        """Group consecutive segments below small_bytes into runs to merge."""
+        runs, run = [], []
+        for number, path in SegmentedStore._segments(partition):
+            if os.path.getsize(path) < small_bytes:
+                run.append((number, path))
+                continue
+            if run:
+                runs.append(run)
+            run = []
+        if run:
+            runs.append(run)
+        return runs
+
+    def compact_in_background(self, retention_days=None):
+        """Start one compaction (and retention) pass on a daemon thread unless one is running."""
+        if self._compactor and self._compactor.is_alive():
+            return self._compactor
+
+        def work():
+            if retention_days:
+                self.apply_retention(retention_days)
+            self.compact()
+
+        self._compactor = threading.Thread(target=work, name="segment-compactor", daemon=True)
+        self._compactor.start()
+        return self._compactor
+
+    def wait_for_compaction(self, timeout=None):
+        """Block until a background pass started by compact_in_background() is done."""
+        if self._compactor:
+            self._compactor.join(timeout)
@@ -0,0 +1,134 @@
+import os
+import json
+import sqlite3
+import threading
+
+from storage.export import export_json
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    _id        TEXT PRIMARY KEY,  -- primary key doubles as the _id index
+    _source    TEXT NOT NULL,
+    _timestamp TEXT NOT NULL,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_source ON records (_source);
+CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (_timestamp);
+CREATE INDEX IF NOT EXISTS idx_records_source_timestamp ON records (_source, _timestamp);
+"""
+
+
+class SQLiteStore:
+    """
+    Record store backed by SQLite in WAL mode. Counts, clears and
+    source/time filters run as SQL, so they don't load records into Python.
+    """
+
+    FETCH_SIZE = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # -------------------------
+    # Writes
+    # -------------------------
+    def append(self, records) -> int:
+        """Insert records in one transaction; ids already present are ignored."""
+        with self._lock, self.conn:
+            return self._insert(records)
+
+    def _insert(self, records) -> int:
+        """Insert within the caller's transaction; returns the rows added."""
+        rows = (
+            (
+                r.get("_id"),
+                r.get("_source", ""),
+                r.get("_timestamp", ""),
+                json.dumps(r, ensure_ascii=False),
+            )
+            for r in records
+        )
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO records (_id, _source, _timestamp, data) "
+            "VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        return self.conn.total_changes - before
+
+    def replace(self, records) -> int:
+        """Swap the contents for records in one transaction, like JSONLStore's file swap."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM records")
+            return self._insert(records)
+
+    def clear(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM records")
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def iter_records(self, source=None, since=None, until=None):
+        """Yield records in insertion order, optionally filtered by source and _timestamp range."""
+        clauses, params = [], []
+        if source:
+            clauses.append("_source = ?")
+            params.append(source)
+        if since:
+            clauses.append("_timestamp >= ?")
+            params.append(since)
+        if until:
+            clauses.append("_timestamp < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        cursor = self.conn.execute(
+            f"SELECT data FROM records {where} ORDER BY rowid", params
+        )
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            for (data,) in rows:
+                yield json.loads(data)
+
+    def __iter__(self):
+        return self.iter_records()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def fingerprint(self):
+        """Cheap change detector used by the stats sidecar."""
+        return list(self.conn.execute("SELECT COUNT(*), MAX(rowid) FROM records").fetchone())
+
+    def count_by_source(self) -> dict:
+        return dict(
+            self.conn.execute(
+                "SELECT _source, COUNT(*) FROM records GROUP BY _source ORDER BY MIN(rowid)"
+            )
+        )
+
+    def export_json(self, output_file: str) -> int:
+        return export_json(self.iter_records(), output_file)
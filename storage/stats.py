@@ -0,0 +1,144 @@
+import os
+import json
+from datetime import datetime
+
+
+def _record_bytes(record):
+    return len(json.dumps(record, ensure_ascii=False).encode("utf-8")) + 1
+
+
+def _empty():
+    return {
+        "total": 0,
+        "bytes": 0,
+        "first_timestamp": None,
+        "last_timestamp": None,
+        "sources": {},
+        "fingerprint": None,
+        "updated_at": None,
+    }
+
+
+class StoreStats:
+    """
+    Sidecar JSON file with running totals for a record store: record and byte
+    counts, first/last _timestamp overall and per source, and the duration of
+    each source's last run. Updated on append/clear so viewing it is O(1).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data = None
+
+    def load(self):
+        if self.data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.data = None
+        return self.data
+
+    def exists(self):
+        return self.load() is not None
+
+    def save(self, store=None):
+        if store is not None:
+            self.data["fingerprint"] = store.fingerprint()
+        self.data["updated_at"] = datetime.utcnow().isoformat()
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def _add(self, record):
+        data = self.data
+        source = record.get("_source", "unknown")
+        timestamp = record.get("_timestamp")
+        size = _record_bytes(record)
+
+        entry = data["sources"].setdefault(
+            source,
+            {"count": 0, "bytes": 0, "first_timestamp": None, "last_timestamp": None},
+        )
+        for target in (data, entry):
+            target["bytes"] += size
+            if timestamp:
+                if not target["first_timestamp"] or timestamp < target["first_timestamp"]:
+                    target["first_timestamp"] = timestamp
+                if not target["last_timestamp"] or timestamp > target["last_timestamp"]:
+                    target["last_timestamp"] = timestamp
+        data["total"] += 1
+        entry["count"] += 1
+
+    def add_records(self, records):
+        """Count records that were just written to the store."""
+        if self.load() is None:
+            self.data = _empty()
+        for record in records:
+            self._add(record)
+
+    def finish_run(self, source, store, duration, added, duplicates=0):
+        """Close out an ingestion run and persist the sidecar."""
+        if self.load() is None:
+            self.data = _empty()
+        entry = self.data["sources"].setdefault(
+            source,
+            {"count": 0, "bytes": 0, "first_timestamp": None, "last_timestamp": None},
+        )
+        entry["last_run"] = {
+            "at": datetime.utcnow().isoformat(),
+            "duration": round(duration, 3),
+            "added": added,
+            "duplicates": duplicates,
+        }
+        self.save(store)
+
+    def reset(self, store=None):
+        self.data = _empty()
+        self.save(store)
+
+    # -------------------------
+    # Consistency
+    # -------------------------
+    def is_stale(self, store) -> bool:
+        """Cheap check: has the store changed since the stats were last written?"""
+        if self.load() is None:
+            return True
+        current = store.fingerprint()
+        return current is not None and current != self.data.get("fingerprint")
+
+    def verify(self, store):
+        """Full check against the store; returns a list of human-readable differences."""
+        stats = self.load() or _empty()
+        actual = store.count_by_source()
+        problems = []
+
+        if stats["total"] != sum(actual.values()):
+            problems.append(f"total: stats {stats['total']}, store {sum(actual.values())}")
+        for source in sorted(set(actual) | set(stats["sources"])):
+            expected = stats["sources"].get(source, {}).get("count", 0)
+            if expected != actual.get(source, 0):
+                problems.append(
+                    f"{source}: stats {expected}, store {actual.get(source, 0)}"
+                )
+        return problems
+
+    def rebuild(self, store):
+        """Recompute everything from the records in the store, keeping last-run info."""
+        old_sources = (self.load() or _empty())["sources"]
+        self.data = _empty()
+        for record in store.iter_records():
+            self._add(record)
+        for source, entry in self.data["sources"].items():
+            if "last_run" in old_sources.get(source, {}):
+                entry["last_run"] = old_sources[source]["last_run"]
+        self.save(store)
+        return self.data
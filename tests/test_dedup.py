@@ -0,0 +1,88 @@
+"""
+Record ids and the dedup index.
+
+    pytest tests/test_dedup.py
+"""
+import os
+import sys
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage.dedup import DedupIndex, record_id  # noqa: E402
+
+RECORD = {"title": "Solid state cells", "content": "Lithium  and\tsodium", "tags": ["grid", "ev"]}
+
+
+def stamped(records, source):
+    return [dict(r, _id=record_id(r, source)) for r in records]
+
+
+@pytest.mark.parametrize("seed", ["0", "1", "4242"])
+def test_record_id_is_stable_across_processes(seed):
+    code = (
+        "import sys; sys.path.insert(0, sys.argv[1]);"
+        "from storage.dedup import record_id;"
+        f"print(record_id({RECORD!r}, 'csv'), record_id({{'url': 'https://a.example.com/x'}}, 'web'))"
+    )
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    out = subprocess.run(
+        [sys.executable, "-c", code, ROOT], env=env, capture_output=True, text=True, check=True
+    ).stdout.split()
+
+    assert out == [record_id(RECORD, "csv"), record_id({"url": "https://a.example.com/x"}, "web")]
+
+
+def test_url_is_normalized():
+    base = record_id({"url": "https://news.example.com/a?id=1"}, "web")
+
+    assert record_id({"url": "HTTPS://News.Example.COM/a?id=1"}, "web") == base
+    assert record_id({"url": "https://news.example.com/a?id=1#comments"}, "web") == base
+    assert record_id({"url": "  https://news.example.com/a?id=1\n"}, "web") == base
+    assert record_id({"url": "https://news.example.com/a?id=2"}, "web") != base
+    assert record_id({"url": "https://news.example.com/A?id=1"}, "web") != base  # paths are case-sensitive
+
+
+def test_whitespace_and_volatile_fields_are_ignored():
+    base = record_id(RECORD, "csv")
+    spaced = dict(RECORD, content=" Lithium and sodium ", title="Solid\nstate   cells")
+
+    assert record_id(spaced, "csv") == base
+    assert record_id(dict(RECORD, _timestamp="2024-01-01T00:00:00", fetched_at="now"), "csv") == base
+    assert record_id(dict(RECORD, title="Solid state cell"), "csv") != base
+
+
+def test_source_and_key_fields_scope_the_id():
+    assert record_id({"id": "bbc-news", "name": "BBC"}, "newsapi") == record_id(
+        {"id": "bbc-news", "name": "BBC News"}, "newsapi"
+    )
+    assert record_id(RECORD, "csv") != record_id(RECORD, "other")
+
+
+def test_duplicates_within_a_batch_are_counted(tmp_path):
+    index = DedupIndex(str(tmp_path / "ids.txt"))
+    records = stamped([RECORD, dict(RECORD, content="other"), dict(RECORD, title=" Solid state cells")], "csv")
+
+    new, duplicates = index.filter_new(records)
+
+    assert [r["content"] for r in new] == [RECORD["content"], "other"]
+    assert duplicates == 1
+
+
+def test_duplicates_across_batches_are_counted(tmp_path):
+    path = str(tmp_path / "ids.txt")
+    index = DedupIndex(path)
+    first, _ = index.filter_new(stamped([RECORD], "csv"))
+    index.add(r["_id"] for r in first)
+
+    second = stamped([RECORD, dict(RECORD, content="new")], "csv")
+    new, duplicates = index.filter_new(second)
+    assert [r["content"] for r in new] == ["new"]
+    assert duplicates == 1
+
+    # The ids persist, so a fresh index (next run) sees the same duplicates
+    assert DedupIndex(path).filter_new(second) == (new, 1)
+    assert len(DedupIndex(path)) == 1
@@ -0,0 +1,150 @@
+"""
+Peak-memory checks for the ingestion paths under a memory budget.
+
+Each path runs at 1x and 10x input and its tracemalloc peak must stay under
+the same fixed bound; a control run of the 10x input without the budget
+must exceed it.
+Near-duplicate detection is off: its signatures are store-sized state
+outside the budget, and pure-Python MinHash under tracemalloc would
+dominate the runtime.
+
+The peak checks take about two minutes and are marked slow:
+
+    pytest --run-slow tests/test_memory.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from benchmarks.fixtures import StandInServer, synthetic_records, write_csv_dir  # noqa: E402
+from pipeline.memory import MemoryBudget  # noqa: E402
+from pipeline.orchestrator import run_concurrently  # noqa: E402
+
+BUDGET_MB = 8
+MB = 1024 * 1024
+
+
+def peak_bytes(fn):
+    """Peak traced memory allocated while fn runs, over what was live before."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - baseline
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """Point main at a fresh output directory under tmp_path, by default with the budget on."""
+    original = dict(main.CONFIG)  # paths are rewritten from these on every call
+
+    def setup(name, urls=(), budget_mb=BUDGET_MB):
+        root = tmp_path / name
+        for key, value in original.items():
+            if isinstance(value, str) and value.startswith(main.BASE_DIR):
+                monkeypatch.setitem(main.CONFIG, key, str(root) + value[len(main.BASE_DIR):])
+        monkeypatch.setitem(main.CONFIG, "csv_dir", str(root / "csv"))
+        monkeypatch.setitem(main.CONFIG, "urls", list(urls))
+        monkeypatch.setitem(main.CONFIG, "scrape_delay", 0)  # the local server is the only host
+        monkeypatch.setitem(main.CONFIG, "near_dup_mode", None)
+        monkeypatch.setitem(main.CONFIG, "memory_budget_mb", budget_mb)
+
+        monkeypatch.setattr(main, "store", main.open_store())
+        monkeypatch.setattr(main, "dedup", main.DedupIndex(main.CONFIG["dedup_index_path"]))
+        monkeypatch.setattr(main, "stats", main.StoreStats(main.CONFIG["stats_path"]))
+        monkeypatch.setattr(main, "search_index", main.InvertedIndex(main.CONFIG["search_index_dir"]))
+        monkeypatch.setattr(main, "clear", lambda: None)
+        monkeypatch.setattr(main, "_clients", {})
+        return root
+
+    return setup
+
+
+@pytest.mark.slow
+def test_append_data_peak_is_bounded(pipeline):
+    peaks = {}
+    for n in (1_000, 10_000):
+        pipeline(f"append_{n}")
+        records = synthetic_records(n)
+        peaks[n] = peak_bytes(lambda: main.append_data(records, "bench"))
+        assert main.store.count() == n
+
+    # Stamped ids and the dedup set still grow with the input
+    assert max(peaks.values()) < 16 * MB, peaks
+
+    pipeline("append_unbudgeted", budget_mb=None)
+    records = synthetic_records(10_000)
+    unbudgeted = peak_bytes(lambda: main.append_data(records, "bench"))
+    assert unbudgeted > 16 * MB, (peaks, unbudgeted)
+
+
+@pytest.mark.slow
+def test_read_csv_peak_is_bounded(pipeline):
+    peaks = {}
+    for rows in (2_000, 20_000):
+        root = pipeline(f"csv_{rows}")
+        write_csv_dir(str(root / "csv"), files=1, rows=rows)
+        peaks[rows] = peak_bytes(main.read_csv)
+        assert main.store.count() == rows
+
+    assert max(peaks.values()) < 8 * MB, peaks
+
+    root = pipeline("csv_unbudgeted", budget_mb=None)
+    write_csv_dir(str(root / "csv"), files=1, rows=20_000)
+    unbudgeted = peak_bytes(main.read_csv)
+    assert unbudgeted > 8 * MB, (peaks, unbudgeted)
+
+
+@pytest.mark.slow
+def test_scrape_web_peak_is_bounded(pipeline):
+    peaks = {}
+    with StandInServer(page_bytes=50_000) as server:
+        for pages in (20, 200):
+            pipeline(f"web_{pages}", server.page_urls(pages))
+            peaks[pages] = peak_bytes(main.scrape_web)
+            assert main.store.count() == pages
+
+        pipeline("web_unbudgeted", server.page_urls(200), budget_mb=None)
+        unbudgeted = peak_bytes(main.scrape_web)
+
+    assert max(peaks.values()) < 8 * MB, peaks
+    assert unbudgeted > 8 * MB, (peaks, unbudgeted)
+
+
+def test_batches_over_budget_spill_to_disk(tmp_path):
+    budget = MemoryBudget(0.05, str(tmp_path / "spill"))
+    written = []
+
+    def write(run, records):
+        time.sleep(0.01)  # slow writer, so batches back up behind it
+        written.extend(r["url"] for r in records)
+
+    def batches():
+        for start in range(0, 2_000, 200):
+            yield synthetic_records(200, start=start)
+
+    report = run_concurrently(
+        {"bench": batches},
+        lambda source: {"source": source},
+        write,
+        lambda run: True,
+        queue_size=4,
+        commit_size=500,
+        budget=budget,
+    )
+
+    assert report["bench"]["status"] == "ok"
+    assert written == [r["url"] for r in synthetic_records(2_000)]
+    assert budget.used == 0
+    assert os.listdir(tmp_path / "spill") == []
+    assert main.REGISTRY.counter("memory_spilled_batches_total").value > 0
@@ -0,0 +1,36 @@
+"""
+Writing the metrics file.
+
+    pytest tests/test_metrics.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.metrics import Registry  # noqa: E402
+
+
+def test_concurrent_writes_publish_whole_files(tmp_path):
+    registry = Registry()
+    for i in range(200):
+        registry.counter("rows_total", "Rows", file=f"{i}.csv").inc(i)
+    expected = registry.render()
+    path = str(tmp_path / "metrics.prom")
+    seen = []
+
+    def writer():
+        for _ in range(30):
+            registry.write(path)
+            with open(path, "r", encoding="utf-8") as f:
+                seen.append(f.read())
+
+    threads = [threading.Thread(target=writer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert set(seen) == {expected}
+    assert os.listdir(tmp_path) == ["metrics.prom"]
@@ -0,0 +1,135 @@
+"""
+Near-duplicate detection: MinHash signatures, LSH banding and the link/drop
+decision at the threshold.
+
+    pytest tests/test_neardup.py
+"""
+import os
+import sys
+import subprocess
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from storage import neardup  # noqa: E402
+from storage.neardup import NearDupIndex, choose_bands, shingles  # noqa: E402
+from storage.search import tokenize  # noqa: E402
+
+STORY = (
+    "Solid state battery maker announces a new factory that will produce sodium "
+    "cells for grid storage and electric vehicles starting next spring in Ohio"
+)
+REWORDED = STORY.replace("next spring", "early next year")
+OTHER = (
+    "City council approves budget for road repairs and a new public library "
+    "branch after months of debate over property taxes and school funding"
+)
+
+
+def jaccard(first, second, size=3):
+    a, b = shingles(tokenize(first), size), shingles(tokenize(second), size)
+    return len(a & b) / len(a | b)
+
+
+def record(rid, text):
+    return {"_id": rid, "title": "", "content": text}
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(neardup, "_numpy", [None])
+    return request.param
+
+
+def test_signature(backend):
+    index = NearDupIndex("unused")
+    signature = index.signature(STORY)
+
+    assert len(signature) == index.num_perm
+    assert signature == NearDupIndex("unused").signature(STORY)  # same seed, same hashes
+    assert index.signature("too short to compare") is None
+    assert index.similarity(signature, index.signature(STORY)) == 1.0
+    estimate = index.similarity(signature, index.signature(REWORDED))
+    assert abs(estimate - jaccard(STORY, REWORDED)) < 0.15
+    assert index.similarity(signature, index.signature(OTHER)) < 0.1
+
+
+def test_numpy_and_python_signatures_match(monkeypatch):
+    pytest.importorskip("numpy")
+    with_numpy = NearDupIndex("unused").signature(STORY)
+    monkeypatch.setattr(neardup, "_numpy", [None])
+    assert NearDupIndex("unused").signature(STORY) == with_numpy
+
+
+@pytest.mark.parametrize("num_perm, threshold", [(128, 0.8), (128, 0.5), (64, 0.9)])
+def test_bands_split_the_signature_near_the_threshold(num_perm, threshold):
+    bands, rows = choose_bands(num_perm, threshold)
+    assert bands * rows == num_perm
+    assert abs((1 / bands) ** (1 / rows) - threshold) < 0.1
+
+    index = NearDupIndex("unused", threshold=threshold, num_perm=num_perm)
+    signature = index.signature(STORY)
+    keys = index._band_keys(signature)
+    assert [band for band, _ in keys] == list(range(bands))
+    assert b"".join(key for _, key in keys) == signature.tobytes()
+
+
+def test_records_sharing_a_band_are_compared(tmp_path):
+    index = NearDupIndex(str(tmp_path / "near.tsv"))
+    index.filter([record("a", STORY)])
+    index.add(["a"])
+    first = index.signature(STORY)
+
+    # Only the first band matches; everything else differs
+    other = index.signature(OTHER)
+    other[:index.rows] = first[:index.rows]
+    index.threshold = 0.0
+    assert index.find(other) == ("a", index.similarity(first, other))
+    assert index.find(index.signature(OTHER)) is None  # no shared band, never compared
+
+
+def test_link_and_drop_at_the_threshold(tmp_path):
+    score = NearDupIndex("unused").similarity(
+        NearDupIndex("unused").signature(STORY), NearDupIndex("unused").signature(REWORDED)
+    )
+
+    at = NearDupIndex(str(tmp_path / "at.tsv"))
+    at.threshold = score  # same bands, only the decision moves
+    linked, found = at.filter([record("a", STORY), record("b", REWORDED)], mode="link")
+    assert found == 1
+    assert [r.get("_duplicate_of") for r in linked] == [None, "a"]
+    assert linked[1]["_similarity"] == round(score, 3)
+
+    dropped, found = at.filter([record("c", STORY), record("d", REWORDED)], mode="drop")
+    assert found == 1
+    assert [r["_id"] for r in dropped] == ["c"]
+
+    above = NearDupIndex(str(tmp_path / "above.tsv"))
+    above.threshold = score + 1 / above.num_perm
+    kept, found = above.filter([record("a", STORY), record("b", REWORDED)], mode="drop")
+    assert found == 0
+    assert [r["_id"] for r in kept] == ["a", "b"]
+
+
+def test_stored_signatures_catch_later_batches(tmp_path):
+    path = str(tmp_path / "near.tsv")
+    index = NearDupIndex(path, threshold=0.5)
+    kept, _ = index.filter([record("a", STORY), record("x", OTHER)])
+    index.add(r["_id"] for r in kept)
+
+    kept, found = NearDupIndex(path, threshold=0.5).filter([record("b", REWORDED)], mode="link")
+    assert found == 1
+    assert kept[0]["_duplicate_of"] == "a"
+
+
+def test_importing_main_does_not_import_numpy():
+    code = "import sys; sys.path.insert(0, sys.argv[1]); import main; print('numpy' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code, ROOT], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "False"
@@ -0,0 +1,128 @@
+"""
+Concurrent runs with a single writer: group commit, deadlines and checkpoints.
+
+    pytest tests/test_orchestrator.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pipeline.orchestrator import run_concurrently  # noqa: E402
+
+
+class Writer:
+    """Records what was written, and when; fails for sources in failing."""
+
+    def __init__(self, failing=(), delay=0.0):
+        self.failing = set(failing)
+        self.delay = delay
+        self.writes = []  # (source, records or checkpoint name, seconds since start)
+        self.started = time.monotonic()
+
+    def start(self, source):
+        return {"source": source}
+
+    def write(self, run, batch):
+        elapsed = time.monotonic() - self.started
+        if callable(batch):
+            self.writes.append((run["source"], batch(), elapsed))
+            return
+        if run["source"] in self.failing:
+            raise OSError("disk full")
+        time.sleep(self.delay)
+        self.writes.append((run["source"], list(batch), elapsed))
+
+    def finish(self, run):
+        return run["source"]
+
+    def run(self, producers, **kwargs):
+        return run_concurrently(producers, self.start, self.write, self.finish, **kwargs)
+
+    def of(self, source):
+        return [batch for s, batch, _ in self.writes if s == source]
+
+
+def test_records_are_grouped_and_checkpoints_follow_them():
+    writer = Writer()
+
+    def batches():
+        yield [1, 2]
+        yield [3]
+        yield lambda: "checkpoint"
+        yield [4]
+
+    report = writer.run({"csv": batches}, commit_size=100)
+
+    assert writer.of("csv") == [[1, 2, 3], "checkpoint", [4]]
+    assert report["csv"]["status"] == "ok"
+    assert report["csv"]["result"] == "csv"
+
+
+def test_skipped_and_failed_producers_are_reported():
+    writer = Writer()
+
+    def broken():
+        yield [1]
+        raise RuntimeError("api down")
+
+    report = writer.run({"none": lambda: None, "broken": broken})
+
+    assert report["none"]["status"] == "skipped"
+    assert report["broken"]["status"] == "failed"
+    assert report["broken"]["error"] == "api down"
+    assert writer.of("broken") == [[1]]
+
+
+def test_deadline_is_kept_while_other_sources_keep_the_queue_busy():
+    writer = Writer(delay=0.01)  # slower than busy, so get() never times out
+
+    def quiet():
+        yield ["early"]
+        time.sleep(1.0)  # nothing else from this source for a while
+
+    def busy():
+        for i in range(100):
+            yield [i, i]  # a full commit each
+
+    writer.run({"quiet": quiet, "busy": busy}, commit_size=2, commit_interval=0.2)
+
+    (written_at,) = [at for source, batch, at in writer.writes if batch == ["early"]]
+    assert written_at < 0.6, writer.writes
+
+
+def test_checkpoints_are_dropped_after_a_failed_write():
+    writer = Writer(failing={"csv"})
+
+    def batches(source):
+        def produce():
+            yield [1]
+            yield lambda: f"{source} checkpoint"
+            yield [2]
+            yield lambda: f"{source} second checkpoint"
+        return produce
+
+    report = writer.run({"csv": batches("csv"), "web": batches("web")}, commit_size=100)
+
+    assert writer.of("csv") == []
+    assert report["csv"]["status"] == "failed"
+    assert report["csv"]["error"] == "disk full"
+    assert writer.of("web") == [[1], "web checkpoint", [2], "web second checkpoint"]
+    assert report["web"]["status"] == "ok"
+
+
+def test_run_duration_covers_fetching():
+    def start(source):
+        return {"source": source, "started": time.monotonic()}
+
+    def finish(run):
+        return time.monotonic() - run["started"]
+
+    def slow():
+        time.sleep(0.3)  # fetching before the first batch
+        yield [1]
+
+    report = run_concurrently({"slow": slow}, start, lambda run, batch: None, finish)
+
+    assert report["slow"]["result"] >= 0.3
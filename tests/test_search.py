@@ -0,0 +1,107 @@
+"""
+Full-text index: posting encoding, segment merges and query filters.
+
+    pytest tests/test_search.py
+"""
+import os
+import sys
+import random
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.search import (  # noqa: E402
+    InvertedIndex,
+    _read_varint,
+    _varint,
+    decode_postings,
+    encode_postings,
+    rebase_postings,
+)
+
+
+def record(i, source="csv", day="2024-01-01", title=None):
+    return {
+        "_id": f"{source}_{i}",
+        "_source": source,
+        "_timestamp": f"{day}T12:00:00",
+        "title": title or f"battery report {i}",
+        "content": "lithium cells" if i % 2 else "sodium cells",
+    }
+
+
+def ids(results):
+    return sorted(r["_id"] for r in results)
+
+
+@pytest.mark.parametrize("value", [0, 1, 127, 128, 300, 16383, 16384, 2**31, 2**63 + 5])
+def test_varint_round_trip(value):
+    out = bytearray()
+    _varint(value, out)
+    assert _read_varint(out, 0) == (value, len(out))
+    assert len(out) == max(1, (value.bit_length() + 6) // 7)
+
+
+def test_postings_round_trip():
+    postings = [(0, 1), (1, 3), (200, 1), (100_000, 129), (100_001, 2)]
+    docs, tfs = decode_postings(encode_postings(postings))
+    assert list(zip(docs, tfs)) == postings
+
+
+def test_rebase_postings_joins_lists():
+    first = [(3, 1), (10, 2)]
+    second = [(11, 4), (500, 1), (70_000, 2)]
+    joined = encode_postings(first) + rebase_postings(encode_postings(second), first[-1][0])
+
+    assert joined == encode_postings(first + second)
+    assert list(zip(*decode_postings(joined))) == first + second
+
+
+def test_search_results_survive_merges(tmp_path):
+    rng = random.Random(3)
+    records = [record(i, source=rng.choice(["csv", "web"])) for i in range(300)]
+    merged = InvertedIndex(str(tmp_path / "merged"), merge_factor=2)
+    single = InvertedIndex(str(tmp_path / "single"))
+
+    start = 0
+    while start < len(records):
+        size = rng.choice([1, 2, 5, 20])
+        merged.add(records[start:start + size])
+        start += size
+    single.add(records)
+
+    assert len(merged._meta["segments"]) < 20
+    for query in ("lithium", "sodium cells", "report 42"):
+        assert merged.search(query, limit=300) == single.search(query, limit=300)
+
+    merged.optimize()
+    assert len(merged._meta["segments"]) == 1
+    assert merged.search("lithium", limit=300) == single.search("lithium", limit=300)
+
+
+def test_mixed_batch_sizes_keep_segments_logarithmic(tmp_path):
+    index = InvertedIndex(str(tmp_path), merge_factor=4)
+    rng = random.Random(1)
+    doc = 0
+    for _ in range(300):
+        size = rng.choice([1, 1, 3, 10, 40])
+        index.add([record(doc + i) for i in range(size)])
+        doc += size
+
+    assert len(index._meta["segments"]) <= 20
+    assert len(index.search("battery", limit=doc)) == doc
+
+
+def test_filters(tmp_path):
+    index = InvertedIndex(str(tmp_path))
+    index.add([record(1, "csv", "2024-01-01"), record(2, "web", "2024-01-02")])
+    index.add([record(3, "csv", "2024-01-03"), record(4, "newsapi", "2024-01-04")])
+
+    assert ids(index.search("battery")) == ["csv_1", "csv_3", "newsapi_4", "web_2"]
+    assert ids(index.search("battery", source="csv")) == ["csv_1", "csv_3"]
+    assert index.search("battery", source="unknown") == []
+    assert ids(index.search("battery", since="2024-01-02")) == ["csv_3", "newsapi_4", "web_2"]
+    assert ids(index.search("battery", until="2024-01-03")) == ["csv_1", "web_2"]
+    assert ids(index.search("battery", source="csv", since="2024-01-02", until="2024-01-04")) == ["csv_3"]
+    assert index.search("the of and") == []
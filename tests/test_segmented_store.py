@@ -0,0 +1,135 @@
+"""
+Segmented store writes and compaction.
+
+    pytest tests/test_segmented_store.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import segmented_store  # noqa: E402
+from storage.segmented_store import APPEND_CHUNK, SegmentedStore  # noqa: E402
+from storage.stats import StoreStats  # noqa: E402
+
+DAY = "2024-01-02"
+
+
+def record(i, source="csv", day=DAY):
+    return {"_id": f"{source}_{i}", "_source": source, "_timestamp": f"{day}T00:00:00", "n": i}
+
+
+def small_segments(store, count=3):
+    """count one-record segments in the DAY partition."""
+    store.max_segment_bytes = 1
+    for i in range(count):
+        store.append([record(i)])
+    store.max_segment_bytes = 64 * 1024 * 1024
+
+
+def test_compaction_merges_small_segments(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+
+    assert store.compact() == 2
+    assert os.listdir(tmp_path / "csv" / DAY) == ["seg-000001.jsonl.gz"]
+    assert [r["n"] for r in store.iter_records()] == [0, 1, 2]
+
+
+def test_record_appended_during_compaction_is_kept(tmp_path, monkeypatch):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+    copy = segmented_store.shutil.copyfileobj
+    late = record("late")
+
+    def copy_then_append(src, dst):
+        copy(src, dst)
+        if late not in store.iter_records():
+            store.append([late])  # a late record for the day being compacted
+
+    monkeypatch.setattr(segmented_store.shutil, "copyfileobj", copy_then_append)
+    store.compact()
+    monkeypatch.setattr(segmented_store.shutil, "copyfileobj", copy)
+
+    assert [r["n"] for r in store.iter_records()] == [0, 1, 2, "late"]
+    assert not [name for name in os.listdir(tmp_path / "csv" / DAY) if name.endswith(".tmp")]
+
+    store.compact()  # the next pass merges them
+    assert os.listdir(tmp_path / "csv" / DAY) == ["seg-000001.jsonl.gz"]
+    assert [r["n"] for r in store.iter_records()] == [0, 1, 2, "late"]
+
+
+def test_compacted_segment_is_merged_again_in_place(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+    store.compact()
+    store.append([record(3)])
+
+    assert store.compact() == 1
+    assert os.listdir(tmp_path / "csv" / DAY) == ["seg-000001.jsonl.gz"]
+    assert [r["n"] for r in store.iter_records()] == [0, 1, 2, 3]
+
+
+def test_append_writes_each_partition_as_it_goes(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    segment = tmp_path / "csv" / DAY / "seg-000001.jsonl"
+    seen_on_disk = []
+
+    def records():
+        for i in range(APPEND_CHUNK * 2 + 10):
+            if i == APPEND_CHUNK * 2:  # csv has buffered a full chunk by now
+                seen_on_disk.append(segment.exists())
+            yield record(i, source="web" if i % 2 else "csv")
+
+    assert store.append(records()) == APPEND_CHUNK * 2 + 10
+    assert seen_on_disk == [True]
+    assert [r["n"] for r in store.iter_records(source="csv")] == list(range(0, APPEND_CHUNK * 2 + 10, 2))
+
+
+def test_retention_makes_stats_stale_but_compaction_does_not(tmp_path):
+    store = SegmentedStore(str(tmp_path / "segments"))
+    stats = StoreStats(str(tmp_path / "stats.json"))
+    small_segments(store)
+    store.append([record(9, day="2024-01-05")])
+    stats.add_records(store.iter_records())
+    stats.save(store)
+
+    store.compact()
+    assert not stats.is_stale(store)
+
+    assert store.drop_before("2024-01-03") == 1
+    assert stats.is_stale(store)
+    assert stats.verify(store) == ["total: stats 4, store 1", "csv: stats 4, store 1"]
+
+
+def test_compaction_removes_output_of_an_interrupted_pass(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+    stale = tmp_path / "csv" / DAY / "seg-000007.jsonl.xz.tmp"  # from a killed pass
+    stale.write_bytes(b"half a gzip stream")
+
+    store.compact()
+
+    assert os.listdir(tmp_path / "csv" / DAY) == ["seg-000001.jsonl.gz"]
+
+
+def test_reads_survive_a_compaction_midway(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+    records = store.iter_records()
+
+    first = next(records)
+    store.compact()  # removes the segments the reader listed
+
+    assert [first["n"]] + [r["n"] for r in records] == [0, 1, 2]
+
+
+def test_wait_for_compaction(tmp_path):
+    store = SegmentedStore(str(tmp_path))
+    small_segments(store)
+
+    store.compact_in_background()
+    store.wait_for_compaction()
+
+    assert not store._compactor.is_alive()
+    assert os.listdir(tmp_path / "csv" / DAY) == ["seg-000001.jsonl.gz"]
@@ -0,0 +1,81 @@
+"""
+Opening the configured store: the JSONL history is imported into a new
+backend once, and not at import time. The CLI waits for background
+compaction before it returns, and replacing a SQLite store's contents
+is all or nothing.
+
+    pytest tests/test_store_import.py
+"""
+import os
+import sys
+import json
+import subprocess
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main  # noqa: E402
+
+
+@pytest.fixture
+def sqlite_config(tmp_path, monkeypatch):
+    save_path = tmp_path / "scraped_data.jsonl"
+    with open(save_path, "w", encoding="utf-8") as f:
+        for i in range(3):
+            f.write(json.dumps({"_id": f"csv_{i}", "_source": "csv", "title": f"row {i}"}) + "\n")
+    monkeypatch.setitem(main.CONFIG, "save_path", str(save_path))
+    monkeypatch.setitem(main.CONFIG, "legacy_save_path", str(tmp_path / "scraped_data.json"))
+    monkeypatch.setitem(main.CONFIG, "sqlite_path", str(tmp_path / "ingestion.db"))
+    monkeypatch.setitem(main.CONFIG, "store_backend", "sqlite")
+    monkeypatch.setattr(main, "log", lambda *args, **kwargs: None)
+    monkeypatch.setattr(main, "store", None)
+    return main.CONFIG
+
+
+def test_history_is_imported_once(sqlite_config):
+    assert main.get_store().count() == 3
+    assert not os.path.exists(sqlite_config["save_path"])
+    assert os.path.exists(sqlite_config["save_path"] + ".imported")
+
+    main.get_store().clear()
+    main.store = None  # next start
+    assert main.get_store().count() == 0
+
+
+def test_store_is_not_opened_at_import():
+    code = "import sys; sys.path.insert(0, sys.argv[1]); import main; print(main.store)"
+    out = subprocess.run(
+        [sys.executable, "-c", code, ROOT], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "None"
+
+
+def test_cli_waits_for_background_compaction(tmp_path, monkeypatch):
+    store = main.SegmentedStore(str(tmp_path / "segments"))
+    compacted = []
+    monkeypatch.setattr(store, "compact", lambda: (time.sleep(0.3), compacted.append(True)))
+    monkeypatch.setattr(main, "store", store)
+    monkeypatch.setattr(main, "tail_logs", lambda lines: None)
+
+    store.compact_in_background()
+    assert main.cli(["logs"]) == 0
+    assert compacted == [True]
+
+
+def test_sqlite_replace_is_all_or_nothing(tmp_path):
+    store = main.SQLiteStore(str(tmp_path / "ingestion.db"))
+    store.append([{"_id": "a", "_source": "csv"}, {"_id": "b", "_source": "csv"}])
+
+    def records():
+        yield {"_id": "c", "_source": "csv"}
+        raise OSError("source went away")
+
+    with pytest.raises(OSError):
+        store.replace(records())
+
+    assert [r["_id"] for r in store.iter_records()] == ["a", "b"]
+    assert store.replace([{"_id": "c", "_source": "csv"}]) == 1
+    assert [r["_id"] for r in store.iter_records()] == ["c"]
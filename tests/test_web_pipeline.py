@@ -0,0 +1,59 @@
+"""
+Pipelined scraping (fetch threads feeding a parse process pool) against the
+local stand-in server.
+
+    pytest tests/test_web_pipeline.py
+"""
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fixtures import StandInServer  # noqa: E402
+from fetchers import web_scraper  # noqa: E402
+from fetchers.web_scraper import WebScraper, parse_page  # noqa: E402
+
+PAGES = 100
+
+
+def dies_on_page_3(page):
+    """parse_page stand-in whose worker is killed mid-run, like an OOM kill."""
+    if page["url"].endswith("/page/3"):
+        os._exit(1)
+    return parse_page(page)
+
+
+def run(scraper, urls, timeout=30):
+    """run_batch on a thread, so a hang fails the test instead of blocking it."""
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(scraper.run_batch(urls)), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "run_batch hung"
+    return results
+
+
+def test_pipelined_run_parses_every_page():
+    with StandInServer(page_bytes=5_000) as server:
+        urls = server.page_urls(20)
+        scraper = WebScraper(delay=0, max_workers=4, parse_workers=2, queue_size=2)
+        results = run(scraper, urls)
+
+    assert [r["url"] for r in results] == urls
+    assert not [r for r in results if "error" in r]
+
+
+def test_dead_parse_worker_reports_the_rest_as_errors(monkeypatch):
+    monkeypatch.setattr(web_scraper, "parse_page", dies_on_page_3)
+
+    with StandInServer(page_bytes=5_000) as server:
+        urls = server.page_urls(PAGES)
+        scraper = WebScraper(delay=0, max_workers=4, parse_workers=2, queue_size=2)
+        results = run(scraper, urls)
+
+    assert len(results) == PAGES
+    assert [r["url"] for r in results] == urls
+    failed = [r for r in results if "error" in r]
+    assert any("parse worker pool failed" in r["error"] for r in failed)
+    assert failed[-1]["url"] == urls[-1]